@@ -0,0 +1,132 @@
+'''
+Benchmarks of the functions folder, with realistic problem sizes.
+The classes follow the conventions of airspeed velocity (asv):
+setup runs before the timing, and the time_ methods are timed
+for each combination of params. Run them with run.py
+'''
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                '..', 'functions'))
+from flow_net_sol import solve_laplace_equation, solve_flow_net
+from rect_load_sol import (stress_at_corner, stress_at_corner_table,
+                           stress_under_rectangles, I3_table)
+from settlements_sol import vert_stress, vert_strain
+from mohr_circle_sol import mohr_circles
+from Circle import Circle
+
+class FlowNet:
+    '''
+    Sheet pile flow net of the notebook, with finer grids
+    '''
+    params = ([0.5, 0.25, 0.125], ['sor', 'direct'])
+    param_names = ['cell_size', 'solver']
+
+    def time_solve_flow_net(self, cell_size, solver):
+        solve_flow_net(10, 2, 6, 12, cell_size, solver=solver)
+
+class LaplaceSolver:
+    '''
+    Heads of the flow net only, on a fine grid
+    '''
+    params = [0.25, 0.125]
+    param_names = ['cell_size']
+
+    def setup(self, cell_size):
+        D = 12
+        x = np.arange(0, 4*D + cell_size, cell_size)
+        y = np.arange(0, D + cell_size, cell_size)
+        self.idx = np.where(x == 2*D)[0][0]
+        idy = np.where(y == 6)[0][0]
+        self.BC = np.zeros((y.size, x.size))
+        self.H0 = np.zeros((y.size, x.size))
+        self.BC[0, :] = 1
+        self.H0[0, :] = 8.0
+        self.BC[idy:, self.idx] = 1
+        self.H0[idy:, self.idx] = 4.0
+
+    def time_sor(self, cell_size):
+        solve_laplace_equation(self.H0.copy(), self.BC, self.idx)
+
+    def time_direct(self, cell_size):
+        solve_laplace_equation(self.H0.copy(), self.BC, self.idx, solver='direct')
+
+class StressGrid:
+    '''
+    Vertical stress on a grid of 10^6 points
+    '''
+    def setup(self):
+        x = np.linspace(-20, 20, 100)
+        z = np.linspace(0.1, 20, 100)
+        self.X, self.Y, self.Z = np.meshgrid(x, x, z)
+        self.m = 10.0 / self.Z
+        self.n = 5.0 / self.Z
+        self.rectangles = np.array([[-8, -4, -2, 4], [2, -4, 8, 4],
+                                    [-3, 6, 3, 12], [-3, -12, 3, -6]], dtype=float)
+        # build the table outside of the timings
+        I3_table()
+
+    def time_stress_at_corner(self):
+        stress_at_corner(self.m, self.n, 100.0)
+
+    def time_stress_under_rectangles(self):
+        stress_under_rectangles(self.X, self.Y, self.Z, self.rectangles, 100.0)
+
+    def time_stress_at_corner_table(self):
+        stress_at_corner_table(self.m, self.n, 100.0)
+
+    def time_stress_under_rectangles_table(self):
+        stress_under_rectangles(self.X, self.Y, self.Z, self.rectangles, 100.0,
+                                method='table')
+
+class Profiles:
+    '''
+    Profiles at the resolution of a CPT (2 cm),
+    one long profile and many boreholes
+    '''
+    def setup(self):
+        rng = np.random.default_rng(0)
+        self.bases = np.arange(1, 5001) * 0.02
+        self.gammas = rng.uniform(16, 21, 5000)
+        self.boreholes = np.tile(self.bases, (200, 1))
+        self.borehole_gammas = rng.uniform(16, 21, (200, 5000))
+        self.gw = rng.uniform(0, 5, 200)
+        self.sigma_0 = np.linspace(1, 1000, 10**6)
+        self.model = rng.integers(1, 4, 10**6)
+
+    def time_vert_stress(self):
+        vert_stress(self.bases, self.gammas, 2.0)
+
+    def time_vert_stress_boreholes(self):
+        vert_stress(self.boreholes, self.borehole_gammas, self.gw)
+
+    def time_vert_strain(self):
+        vert_strain(self.sigma_0, 50.0, 15.0, self.model)
+
+class MohrCircles:
+    '''
+    Mohr circles of many stress states
+    '''
+    def setup(self):
+        rng = np.random.default_rng(0)
+        self.sx = rng.uniform(0, 300, 10**6)
+        self.sz = rng.uniform(0, 300, 10**6)
+        self.txz = rng.uniform(-100, 100, 10**6)
+        self.circles = [Circle([c, 0.0], r) for c, r in
+                        zip(self.sx[:10000], self.sz[:10000] / 3)]
+
+    def time_mohr_circles(self):
+        mohr_circles(self.sx, self.sz, self.txz)
+
+    def time_circle_coordinates(self):
+        for circle in self.circles:
+            circle.coordinates()
+
+    def time_circle_coordinates_of(self):
+        Circle.coordinates_of(self.circles)
+
+    def time_chord_endpoint(self):
+        for circle in self.circles[:2000]:
+            circle.chord_endpoint(circle.coordinates_at_angle(0.3), 1.0)
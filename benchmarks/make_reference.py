@@ -0,0 +1,51 @@
+'''
+Make the reference outputs of the benchmarks with the
+functions of a git revision:
+
+python benchmarks/make_reference.py revision
+
+reference.npz was made with the original (loop based) functions,
+the parent of the commit that vectorized solve_laplace_equation:
+
+python benchmarks/make_reference.py "$(git log -1 --format=%H \
+    --grep='Vectorized red-black SOR')~1"
+'''
+import os
+import sys
+import subprocess
+import importlib.util
+import tempfile
+import numpy as np
+from reference import compute
+
+modules = ['flow_net_sol', 'rect_load_sol', 'settlements_sol', 'Circle']
+here = os.path.dirname(os.path.abspath(__file__))
+
+def load_modules(revision):
+    '''
+    Import the modules of the functions folder at a git revision
+    '''
+    loaded = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for name in modules:
+            source = subprocess.run(
+                ['git', 'show', f'{revision}:functions/{name}.py'],
+                cwd=here, capture_output=True, text=True, check=True).stdout
+            filename = os.path.join(directory, name + '.py')
+            with open(filename, 'w') as file:
+                file.write(source)
+            spec = importlib.util.spec_from_file_location(name, filename)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+            loaded[name] = module
+    return loaded
+
+if __name__ == '__main__':
+    if len(sys.argv) != 2:
+        print('Error: give the git revision of the functions, see the '
+              'docstring of make_reference.py')
+        sys.exit(1)
+    revision = sys.argv[1]
+    results = compute(**load_modules(revision))
+    np.savez(os.path.join(here, 'reference.npz'), **results)
+    print(f'Reference outputs of {revision}: {", ".join(results)}')
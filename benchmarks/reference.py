@@ -0,0 +1,138 @@
+import numpy as np
+
+# reference cases: small enough that the original (loop based)
+# functions run in a few seconds, and computed only with the
+# arguments that both the original and the current functions take
+
+def flow_net_case():
+    '''
+    Boundary conditions of the heads of the flow net
+    notebook example, as in flow_net_sol.solve_flow_net
+    '''
+    H1, H2, H3, D, cell_size = 10, 2, 6, 12, 1
+    x = np.arange(0, 4*D + cell_size, cell_size)
+    y = np.arange(0, D + cell_size, cell_size)
+    idx = np.where(x == 2*D)[0][0]
+    idy = np.where(y == H3)[0][0]
+    BC = np.zeros((y.size, x.size))
+    H = np.zeros((y.size, x.size))
+    BC[0, :] = 1
+    H[0, :] = H1 - H2
+    BC[idy:, idx] = 1
+    H[idy:, idx] = (H1 - H2) / 2.0
+    return H, BC, idx
+
+def compute(flow_net_sol, rect_load_sol, settlements_sol, Circle):
+    '''
+    Compute the reference outputs with the given modules
+
+    Input:
+    flow_net_sol, rect_load_sol, settlements_sol, Circle:
+        modules of the functions folder
+
+    Output:
+    Dictionary of arrays
+    '''
+    results = {}
+
+    # heads of the flow net, left half of the grid
+    H, BC, idx = flow_net_case()
+    flow_net_sol.solve_laplace_equation(H, BC, idx, tolerance=1e-8)
+    results['flow_net_H'] = H[:, :idx+1]
+
+    # I3 of a grid of m and n
+    m, n = np.meshgrid(np.logspace(-1, 1, 40), np.logspace(-1, 1, 40))
+    corner = np.vectorize(rect_load_sol.stress_at_corner)
+    results['stress_at_corner'] = corner(m, n, 1.0)
+
+    # stresses in a layered profile
+    bases = np.cumsum(np.linspace(0.5, 3.0, 12))
+    gammas = np.linspace(16.0, 21.0, 12)
+    sz_total, u, sz_eff = settlements_sol.vert_stress(bases, gammas, 2.5)
+    results['vert_stress'] = np.stack((sz_total, u, sz_eff))
+
+    # strain of the three models, the original function
+    # returns a scalar for model 1
+    sigma_0 = np.linspace(10.0, 300.0, 50)
+    results['vert_strain'] = np.stack([np.broadcast_to(
+        settlements_sol.vert_strain(sigma_0, 100.0, 15.0, model), sigma_0.shape)
+        for model in [1, 2, 3]])
+
+    # circle methods
+    circle = Circle.Circle([100.0, 0.0], 50.0)
+    results['circle_coordinates'] = np.stack(circle.coordinates())
+    results['circle_chords'] = np.array([
+        circle.chord_endpoint(circle.coordinates_at_angle(a), a / 3 + 0.2)
+        for a in np.linspace(0.1, 6.0, 20)])
+    results['circle_tangent'] = np.array(circle.tangent_from_origin())
+    circle.fit_three_points(np.array([[0.0, 0.0], [4.0, 2.0], [8.0, 0.0]]))
+    results['circle_fit'] = np.array([*circle.center, circle.radius])
+
+    return results
+
+# tolerances of the comparison, the flow net is
+# solved iteratively by both versions
+tolerances = {'flow_net_H': 1e-5}
+
+def check(reference_file, modules):
+    '''
+    Compare the outputs of the current functions with the
+    reference file made by make_reference.py
+
+    Input:
+    reference_file: name of the .npz file
+    modules: dictionary with the modules of compute
+
+    Output:
+    List of the names of the outputs that differ
+    '''
+    reference = np.load(reference_file)
+    results = compute(**modules)
+    failed = []
+    for name in reference.files:
+        atol = tolerances.get(name, 1e-10)
+        if not np.allclose(results[name], reference[name], rtol=1e-9, atol=atol):
+            failed.append(name)
+    return failed
+
+def check_notebooks(grain_size_sol):
+    '''
+    Compare the outputs of the functions with the values
+    printed in the notebooks
+
+    Input:
+    grain_size_sol: module of the functions folder
+
+    Output:
+    List of the names of the outputs that differ
+    '''
+    failed = []
+
+    # soil at Møllebukta, sieves down to 0.063 mm, the pan is silt
+    results = grain_size_sol.sieve_analysis(
+        [8, 4, 2, 1, 0.5, 0.25, 0.125, 0.063],
+        [12.8, 43.3, 66, 54.5, 59.9, 68.1, 40.2, 5.6, 0.1],
+        boundaries=[0.002, 0.063, 2, 60])
+    expected = {'gravel': 34.84, 'sand': 65.14, 'silt': 0.03, 
+                'cobbles': 0.0, 'D60': 1.668, 'D10': 0.216, 'Cu': 7.71}
+    for name, value in expected.items():
+        if not np.isclose(results[name][0], value, atol=0.005):
+            failed.append(f'grain_size {name}')
+    if not np.isnan(results['clay'][0]):
+        failed.append('grain_size clay')
+
+    # soils A and B of exercise 1.1 of Aarhaug (1984)
+    results = grain_size_sol.sieve_analysis(
+        [60, 10, 5, 2, 1, 0.6, 0.2, 0.1, 0.06, 0.02, 0.01, 0.006, 0.002],
+        [[0, 75, 35, 55, 50, 35, 65, 35, 25, 45, 25, 15, 20, 20],
+         [0, 0, 0, 0, 0, 10, 110, 130, 90, 120, 35, 5, 0, 0]],
+        boundaries=[0.002, 0.063, 2, 60])
+    expected = {'gravel': [33.00, 0.00], 'sand': [41.62, 66.65], 
+                'silt': [21.37, 33.35], 'clay': [4.00, 0.00],
+                'D60': [1.300, 0.138], 'D10': [0.009, 0.023], 
+                'Cu': [150.00, 5.93]}
+    for name, value in expected.items():
+        if not np.allclose(results[name], value, atol=0.006):
+            failed.append(f'grain_size {name}')
+
+    return failed
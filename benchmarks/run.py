@@ -0,0 +1,81 @@
+'''
+Check the outputs of the functions against the reference
+outputs and the values of the notebooks, then time the benchmarks and add the timings to
+results.jsonl, so they can be compared over time:
+
+python benchmarks/run.py [name filter]
+
+The timings are not recorded if any output differs
+from the reference
+'''
+import os
+import sys
+import json
+import time
+import inspect
+import itertools
+import platform
+import subprocess
+import timeit
+import numpy as np
+import benchmarks
+import reference
+import flow_net_sol, rect_load_sol, settlements_sol, Circle, grain_size_sol
+
+here = os.path.dirname(os.path.abspath(__file__))
+
+def benchmark_cases(pattern=''):
+    '''
+    Generate the name, class and parameters of the benchmarks
+    '''
+    for class_name, cls in inspect.getmembers(benchmarks, inspect.isclass):
+        if cls.__module__ != benchmarks.__name__:
+            continue
+        params = getattr(cls, 'params', ())
+        # a single list of params is one parameter
+        if params and not isinstance(params, tuple):
+            params = (params,)
+        for method in sorted(m for m in dir(cls) if m.startswith('time_')):
+            for values in itertools.product(*params):
+                name = f'{class_name}.{method}'
+                if values:
+                    name += '(' + ', '.join(map(str, values)) + ')'
+                if pattern in name:
+                    yield name, cls, method, values
+
+def time_case(cls, method, values, repeat=3):
+    '''
+    Best time in seconds of a benchmark
+    '''
+    instance = cls()
+    if hasattr(instance, 'setup'):
+        instance.setup(*values)
+    function = getattr(instance, method)
+    # warm up, e.g. cached factorizations
+    function(*values)
+    return min(timeit.repeat(lambda: function(*values), number=1, repeat=repeat))
+
+if __name__ == '__main__':
+    pattern = sys.argv[1] if len(sys.argv) > 1 else ''
+
+    modules = {'flow_net_sol': flow_net_sol, 'rect_load_sol': rect_load_sol,
+               'settlements_sol': settlements_sol, 'Circle': Circle}
+    failed = reference.check(os.path.join(here, 'reference.npz'), modules)
+    failed += reference.check_notebooks(grain_size_sol)
+    if failed:
+        print(f'Outputs differ from the reference: {", ".join(failed)}')
+        sys.exit(1)
+    print('Outputs agree with the reference')
+
+    timings = {}
+    for name, cls, method, values in benchmark_cases(pattern):
+        timings[name] = time_case(cls, method, values)
+        print(f'{name:60s} {timings[name]*1000:10.2f} ms')
+
+    commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=here,
+                            capture_output=True, text=True).stdout.strip()
+    record = {'time': time.strftime('%Y-%m-%dT%H:%M:%S'), 'commit': commit,
+              'machine': platform.node(), 'python': platform.python_version(),
+              'numpy': np.__version__, 'timings': timings}
+    with open(os.path.join(here, 'results.jsonl'), 'a') as file:
+        file.write(json.dumps(record) + '\n')
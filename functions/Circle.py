@@ -1,5 +1,22 @@
 # import numpy library
 import numpy as np
+# import cache decorator
+from functools import lru_cache
+
+@lru_cache(maxsize=32)
+def unit_arc(angle_start=0, angle_end=2*np.pi, inc=np.pi/180):
+	"""
+	Cosines and sines of the angles of an arc of the
+	unit circle, from angle_start to angle_end every inc.
+	The tables are cached, so circles drawn with the same
+	arc and resolution share them. They are read-only
+	"""
+	theta = np.arange(angle_start,angle_end+inc,inc)
+	cos = np.cos(theta)
+	sin = np.sin(theta)
+	cos.flags.writeable = False
+	sin.flags.writeable = False
+	return cos, sin
 
 class Circle:
 	"""
@@ -9,6 +26,9 @@ class Circle:
 	+ angles are measured counter-clockwise from the x-axis
 	"""
 
+	# no instance dictionary, only these attributes
+	__slots__ = ('_center', 'radius')
+
 	def __init__(self, center, radius):
 		"""
 		Initialize the circle with a center and radius
@@ -16,6 +36,19 @@ class Circle:
 		self.center = center
 		self.radius = radius
 	
+	@property
+	def center(self):
+		"""
+		Center of the circle, a numpy array [x, y]
+		"""
+		return self._center
+	
+	@center.setter
+	def center(self, value):
+		# copy, so the input list or array is not modified
+		# when the circle is shifted
+		self._center = np.array(value, dtype=float)
+	
 	# other derived attributes
 	
 	def circumference(self):
@@ -30,15 +63,29 @@ class Circle:
 		"""
 		return np.pi * self.radius ** 2
 	
-	def coordinates(self, angle_start=0, angle_end=2*np.pi):
+	def coordinates(self, angle_start=0, angle_end=2*np.pi, inc=np.pi/180):
 		"""
 		x and y coordinates defining arc of circle.
-		Default is full circle
+		Default is full circle, with 1 degree increment
 		"""
-		inc = 1 * np.pi / 180 # 1 degree increment
-		theta = np.arange(angle_start,angle_end+inc,inc) 
-		x = self.radius * np.cos(theta) + self.center[0]
-		y = self.radius * np.sin(theta) + self.center[1]
+		cos, sin = unit_arc(angle_start, angle_end, inc)
+		x = self.radius * cos + self.center[0]
+		y = self.radius * sin + self.center[1]
+		return x, y
+	
+	@classmethod
+	def coordinates_of(cls, circles, angle_start=0, angle_end=2*np.pi, 
+					   inc=np.pi/180):
+		"""
+		x and y coordinates defining arcs of many circles.
+		Default is full circles, with 1 degree increment
+		Returns two (n_circles, n_points) arrays
+		"""
+		centers = np.array([circle.center for circle in circles]).reshape(-1, 2)
+		radii = np.array([circle.radius for circle in circles], dtype=float)
+		cos, sin = unit_arc(angle_start, angle_end, inc)
+		x = radii[:, None] * cos + centers[:, 0:1]
+		y = radii[:, None] * sin + centers[:, 1:2]
 		return x, y
 	
 	def coordinates_at_angle(self, angle):
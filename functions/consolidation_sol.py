@@ -0,0 +1,194 @@
+import numpy as np
+from settlements_sol import vert_strain
+
+def degree_of_consolidation(Tv, n_terms=100):
+    """
+    Average degree of consolidation of Terzaghi's
+    solution for a uniform layer under a uniform load
+
+    Input:
+    Tv: time factor cv * t / H^2, scalar or array
+    n_terms: number of terms of the series
+
+    Output:
+    U: average degree of consolidation, between 0 and 1
+    """
+    Tv = np.asarray(Tv, dtype=float)
+    M = np.pi * (2 * np.arange(n_terms) + 1) / 2
+    # terms of the series in the last axis
+    terms = 2 / M**2 * np.exp(-M**2 * Tv[..., None])
+    return (1 - np.sum(terms, axis=-1))[()]
+
+def terzaghi_series(z, t, H, cv, u0=1.0, n_terms=100):
+    """
+    Excess pore pressure of Terzaghi's solution for a
+    uniform layer under a uniform load applied at t = 0,
+    at all the combinations of depths and times.
+    z is measured from the drained boundary, and H is the
+    drainage path: the thickness of the layer if it drains
+    on one side, or half the thickness if it drains on both.
+    Use consistent units, e.g. cv in m^2/year and t in years
+
+    Input:
+    z: array of depths from the drained boundary in m
+    t: array of times
+    H: drainage path in m
+    cv: coefficient of consolidation
+    u0: initial excess pore pressure (kPa)
+    n_terms: number of terms of the series
+
+    Output:
+    u: len(t) x len(z) array of excess pore pressures (kPa)
+    """
+    z = np.atleast_1d(np.asarray(z, dtype=float))
+    Tv = cv * np.atleast_1d(np.asarray(t, dtype=float)) / H**2
+    u = np.zeros((len(Tv), len(z)))
+    # add the terms one by one, each on the whole grid
+    for m in range(n_terms):
+        M = np.pi * (2 * m + 1) / 2
+        u += (2 * u0 / M) * np.outer(np.exp(-M**2 * Tv), np.sin(M * z / H))
+    return u
+
+def node_values(z, bases, values):
+    """
+    Values of the layers at the nodes of a profile,
+    for example cv or modulus numbers.
+    Nodes at a layer base take the value of the layer
+
+    Input:
+    z: array of node depths in m
+    bases: array of layer bases' depths in m
+    values: array of layer values
+
+    Output:
+    array of values at the nodes
+    """
+    layer = np.minimum(np.searchsorted(bases, z), len(bases) - 1)
+    return np.asarray(values)[layer]
+
+def consolidation_fd(z, t, cv, load_times, loads, mv=1.0,
+                     top_drained=True, bottom_drained=False, theta=1.0,
+                     startup_steps=2):
+    """
+    Excess pore pressure during 1-D consolidation of a
+    layered profile, by implicit finite differences.
+    The load is applied in stages: the increase in total
+    vertical stress is given at a number of times, and
+    changes linearly between them. The equation
+        mv du/dt = d/dz (cv mv du/dz) + mv dsigma/dt
+    is solved with a tridiagonal system per time step, which
+    is factorized only when the time step changes, so
+    cv and mv can change from node to node (layers).
+    Use consistent units, e.g. cv in m^2/year and t in years
+
+    Input:
+    z: array of node depths in m, in increasing order
+    t: array of times of the steps, t[0] is the start
+    cv: coefficient of consolidation at the nodes, or a single value
+    load_times: array of times of the load stages, in increasing order
+    loads: increase in total vertical stress (kPa) at the load
+        times, array with one value per load time, or a
+        load times x nodes array with one profile per load time
+        (e.g. from rect_load_sol). The load is constant before the
+        first and after the last load time
+    mv: coefficient of volume compressibility at the nodes
+        (e.g. 1 / M), or a single value. Only the ratios
+        between nodes matter
+    top_drained: Boolean, True if the top of the profile drains
+    bottom_drained: Boolean, True if the base of the profile drains
+    theta: 1 for the implicit (backward Euler) scheme,
+        0.5 for Crank-Nicolson
+    startup_steps: number of backward Euler steps at the start
+        when theta < 1, by default 2. Crank-Nicolson oscillates 
+        after the sudden load at the start (u[0] is the load and
+        the drained boundaries are 0), and these steps damp 
+        the oscillations (Rannacher start-up)
+
+    Output:
+    u: len(t) x len(z) array of excess pore pressures (kPa)
+    delta_sigma: len(t) x len(z) array of the increase
+        in total vertical stress (kPa)
+    """
+    from scipy.linalg.lapack import dgttrf, dgttrs
+
+    z = np.asarray(z, dtype=float)
+    t = np.asarray(t, dtype=float)
+    n = len(z)
+    cv = np.broadcast_to(np.asarray(cv, dtype=float), (n,))
+    mv = np.broadcast_to(np.asarray(mv, dtype=float), (n,))
+
+    # load at the step times, interpolated at each node
+    loads = np.asarray(loads, dtype=float)
+    if loads.ndim == 1:
+        loads = np.outer(loads, np.ones(n))
+    # the interpolation weights are the same for all the nodes
+    weights = np.array([np.interp(t, load_times, row)
+                        for row in np.eye(len(load_times))])
+    delta_sigma = weights.T @ loads
+
+    # conductance of the intervals, harmonic mean of the nodes
+    h = np.diff(z)
+    k = cv * mv
+    conductance = 2 * k[:-1] * k[1:] / (k[:-1] + k[1:]) / h
+    # storage of the nodes, half intervals around them
+    storage = mv * (np.append(h, 0) + np.insert(h, 0, 0)) / 2
+
+    # diagonal of the stiffness matrix
+    diagonal = np.zeros(n)
+    diagonal[:-1] += conductance
+    diagonal[1:] += conductance
+    # nodes with zero excess pore pressure
+    drained = np.zeros(n, dtype=bool)
+    drained[0] = top_drained
+    drained[-1] = bottom_drained
+
+    u = np.zeros((len(t), n))
+    # undrained response to the load at the start
+    u[0] = np.where(drained, 0.0, delta_sigma[0])
+    # off diagonals without the rows and columns of the drained nodes
+    upper = np.where(drained[:-1], 0.0, conductance)
+    lower = np.where(drained[1:], 0.0, conductance)
+    dt_factorized, theta_factorized = np.inf, None
+    for j in range(1, len(t)):
+        dt = t[j] - t[j-1]
+        # Crank-Nicolson oscillates after the sudden load at the 
+        # start, the first steps are implicit (Rannacher start-up)
+        theta_j = 1.0 if j <= startup_steps else theta
+        # factorize the tridiagonal matrix when the time step
+        # or theta changes
+        if abs(dt - dt_factorized) > 1e-9 * dt or theta_j != theta_factorized:
+            system = dgttrf(-theta_j * dt * lower,
+                            np.where(drained, 1.0, storage + theta_j * dt * diagonal),
+                            -theta_j * dt * upper)
+            dt_factorized, theta_factorized = dt, theta_j
+        # right hand side: explicit part and load increment
+        flow = -diagonal * u[j-1]
+        flow[:-1] += conductance * u[j-1, 1:]
+        flow[1:] += conductance * u[j-1, :-1]
+        rhs = (storage * (u[j-1] + delta_sigma[j] - delta_sigma[j-1])
+               + (1 - theta_j) * dt * flow)
+        rhs[drained] = 0.0
+        u[j] = dgttrs(*system[:-1], rhs)[0]
+
+    return u, delta_sigma
+
+def consolidation_settlement(z, sigma_0, delta_sigma, u, modulus, model=1):
+    """
+    Settlement versus time of a profile, from the increase
+    in effective vertical stress delta_sigma - u at the nodes
+    and the strain of settlements_sol.vert_strain
+
+    Input:
+    z: array of node depths in m
+    sigma_0: initial effective vertical stress at the nodes (kPa)
+    delta_sigma: times x nodes array of the increase in
+        total vertical stress (kPa), as from consolidation_fd
+    u: times x nodes array of excess pore pressures (kPa)
+    modulus: modulus numbers at the nodes
+    model: models at the nodes, see vert_strain
+
+    Output:
+    settlement: array of settlements in m, one per time
+    """
+    epsilon = vert_strain(sigma_0, delta_sigma - u, modulus, model)
+    return np.trapezoid(epsilon, z, axis=-1)
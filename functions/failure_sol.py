@@ -0,0 +1,104 @@
+import numpy as np
+from stress_profile_sol import stress_profiles
+
+def in_situ_stresses(z, bases, gammas, k0, gw, gamma_w=9.81, q=0):
+    """
+    Calculate the in-situ stresses at any depth in a soil
+    mass consisting of a number of horizontal layers,
+    for example at all the nodes of a stress grid.
+    The layers are defined as in stress_profile.
+
+    Input:
+    z: array of depths in meters, above the base of the last layer
+    bases: array of layer bases' depths in meters
+    gammas: array of layer unit weights in kN/m3
+    k0: effective coefficient of earth pressure at rest
+    gw: groundwater level in meters
+    gamma_w: unit weight of water, kN/m3
+    q: surcharge load in kN/m2
+
+    Output:
+    sz_eff: effective vertical stress (kPa)
+    sx_eff: effective horizontal stress (kPa)
+    u: pore water pressure (kPa)
+    """
+    z = np.asarray(z, dtype=float)
+    depths, sz_total, u, sz_eff, sx_eff, sx_total = stress_profiles(
+        bases, gammas, k0, gw, gamma_w, q)
+    # the total stress is linear within each layer
+    sz_total = np.interp(z, depths, sz_total)
+    # the pore pressure is computed directly, since the
+    # groundwater level may be inside a layer
+    u = np.where(z > gw, gamma_w * (z - gw), 0.0)
+    sz_eff = sz_total - u
+    # k0 of the layer at each depth
+    layer = np.minimum(np.searchsorted(bases, z), len(bases) - 1)
+    sx_eff = np.asarray(k0, dtype=float)[layer] * sz_eff
+    return sz_eff, sx_eff, u
+
+def mohr_coulomb(sx, sz, txz, c, phi):
+    """
+    Compare stress states with the Mohr-Coulomb
+    failure envelope tau = c + sigma * tan(phi).
+    Compressive stresses are positive.
+
+    Input:
+    sx: effective horizontal stress (kPa)
+    sz: effective vertical stress (kPa)
+    txz: shear stress (kPa)
+    c: effective cohesion (kPa)
+    phi: effective friction angle in degrees
+    All inputs can be scalars or arrays that broadcast
+
+    Output:
+    phi_mob: mobilized friction angle in degrees, the angle of
+        the envelope with the same attraction (c / tan(phi))
+        that is tangent to the Mohr circle
+    distance: distance from the Mohr circle to the envelope
+        (kPa), negative if the circle crosses the envelope
+    fos: local factor of safety, the ratio of the distance
+        from the circle center to the envelope to the radius
+    """
+    phi = np.radians(phi)
+    # center and radius of the Mohr circles
+    center = (sx + sz) / 2.0
+    radius = np.hypot((sx - sz) / 2.0, txz)
+    # distance from the center to the envelope
+    strength = c * np.cos(phi) + center * np.sin(phi)
+    distance = strength - radius
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # attraction
+        a = np.where(np.tan(phi) > 0, c / np.tan(phi), np.inf)
+        sin_mob = np.clip(radius / (center + a), 0.0, 1.0)
+        sin_mob = np.where(center + a > 0, sin_mob, 1.0)
+        phi_mob = np.degrees(np.arcsin(sin_mob))
+        fos = np.where(radius > 0, strength / radius, np.inf)
+    return phi_mob, distance, fos
+
+def failure_field(z, dsz, dsx, txz, bases, gammas, k0, gw, c, phi,
+                  gamma_w=9.81, q=0):
+    """
+    Add the stresses due to a load (for example from
+    strip_load_sol or rect_load_sol) to the in-situ stresses,
+    and compare the result with the Mohr-Coulomb envelope.
+    The pore pressure is not changed by the load (drained).
+
+    Input:
+    z: array of depths in meters, for example a grid
+    dsz: increase in vertical stress at z (kPa)
+    dsx: increase in horizontal stress at z (kPa)
+    txz: shear stress at z (kPa)
+    bases, gammas, k0, gw, gamma_w, q: layers as in stress_profile
+    c: effective cohesion (kPa)
+    phi: effective friction angle in degrees
+
+    Output:
+    phi_mob, distance, fos: as in mohr_coulomb
+    yielded: fraction of the points with fos < 1
+    """
+    sz_eff, sx_eff, u = in_situ_stresses(z, bases, gammas, k0, gw,
+                                         gamma_w, q)
+    phi_mob, distance, fos = mohr_coulomb(sx_eff + dsx, sz_eff + dsz, txz,
+                                          c, phi)
+    yielded = np.mean(fos < 1.0)
+    return phi_mob, distance, fos, yielded
@@ -1,68 +1,184 @@
+import hashlib
+import time
 import numpy as np
 from matplotlib import pyplot as plt
+import profiling
 
-def solve_laplace_equation(A, BC, idx, tolerance=1e-3, max_iter=1000):
+# sparse LU factorizations of the finite difference system,
+# keyed by the grid shape, idx and the boundary conditions mask
+_factorizations = {}
+# maximum number of factorizations kept in memory
+max_factorizations = 8
+
+def laplace_factorization(BC, idx):
+    '''
+    This function assembles the 5-point finite difference 
+    system of the Laplace equation on the left half of the grid
+    (Eq. 11.23 of Budhu (2007), Soil Mechanics and Foundations)
+    and factorizes it with a sparse LU decomposition.
+    The factorization is cached, so grids with the same
+    shape, idx and boundary conditions mask reuse it
+
+    Input:
+    BC: Boundary conditions array
+    idx: Index at the middle x of the grid
+
+    Output:
+    lu: Sparse LU factorization of the free nodes system
+    coupling: Sparse matrix coupling the free nodes 
+        to the boundary nodes
+    free: Boolean mask of the free nodes in the left half
+    '''
+    from scipy import sparse
+    from scipy.sparse.linalg import splu
+
+    free = BC[:, :idx+1] == 0
+    key = (free.shape, hashlib.sha1(np.packbits(free).tobytes()).hexdigest())
+    if key in _factorizations:
+        return _factorizations[key]
+    
+    # node numbers of the left half of the grid
+    n_rows, n_cols = free.shape
+    i, j = np.indices(free.shape)
+    nodes = i * n_cols + j
+    # neighbours, mirrored at the edges as in solve_laplace_equation
+    left = i * n_cols + np.where(j == 0, j + 1, j - 1)
+    right = i * n_cols + np.where(j == n_cols - 1, j - 1, j + 1)
+    top = np.where(i == 0, i + 1, i - 1) * n_cols + j
+    bottom = np.where(i == n_rows - 1, i - 1, i + 1) * n_cols + j
+    # sum of the neighbours operator, mirrored nodes count twice
+    rows = np.tile(nodes.ravel(), 4)
+    cols = np.concatenate([left.ravel(), right.ravel(), 
+                           top.ravel(), bottom.ravel()])
+    size = free.size
+    L = sparse.csr_matrix((np.ones(rows.size), (rows, cols)), 
+                          shape=(size, size))
+    # 4 A - sum of neighbours = 0 at the free nodes
+    K = 4.0 * sparse.identity(size, format='csr') - L
+    f = free.ravel()
+    lu = splu(K[f][:, f].tocsc())
+    coupling = L[f][:, ~f].tocsr()
+
+    # store the factorization, drop the oldest one if needed
+    if len(_factorizations) >= max_factorizations:
+        _factorizations.pop(next(iter(_factorizations)))
+    _factorizations[key] = (lu, coupling, free)
+
+    return lu, coupling, free
+
+def solve_laplace_equation(A, BC, idx, tolerance=1e-3, max_iter=10000, omega=None,
+                           solver='sor', callback=None):
     '''
     This function solves the Laplace equation.
     Based on Budhu (2007), Soil Mechanics and Foundations.    
     
+    The nodes are updated with vectorized red-black 
+    successive over-relaxation (SOR) sweeps. The iteration 
+    stops when the largest residual of the finite difference
+    equation, divided by (1 - spectral radius of the Jacobi
+    iteration), is below the tolerance. This is an upper 
+    bound of the error in A, so the stopping rule does
+    not depend on the cell size
+    
     Input:
     A: Parameter array, for example head or flow
     BC: Boundary conditions array
     idx: Index at the middle x of the grid
-    tolerance: Tolerance for the solution, by default 1e-3
-    max_iter: Maximum number of iterations, by default 1000
+    tolerance: Tolerance for the error of the solution, by default 1e-3
+    max_iter: Maximum number of iterations, by default 10000
+    omega: Relaxation factor between 1 and 2, by default None
+        which estimates the optimal value from the grid size
+    solver: 'sor' for the iterative solution (default), or
+        'direct' for a sparse LU solution. The factorization
+        is cached (see laplace_factorization), so problems 
+        that only change the boundary values are solved
+        by back-substitution. tolerance, max_iter and omega 
+        are not used by the direct solver
+    callback: function called after each SOR iteration as
+        callback(iteration, residual), by default None.
+        If it returns True, the iteration stops
 
     Output:
-    None, the solution is stored in the array A 
+    report: dictionary with the number of 'iterations', 
+        the 'residuals' array (the error bound before each
+        iteration), 'converged' (Boolean) and the wall 'time'
+        in seconds. The solution is stored in the array A 
     '''
-    # initialize difference and counter
-    difference = 1.0
+    start = time.perf_counter()
+    # make sure solver is either sor or direct
+    if solver not in ['sor', 'direct']:
+        print("Error: solver must be either 'sor' or 'direct'")
+        return
+    
+    # the problem is symmetric, 
+    # so we solve only for the left half of the grid.
+    if solver == 'direct':
+        lu, coupling, free = laplace_factorization(BC, idx)
+        # boundary values go to the right hand side
+        half = A[:, :idx+1]
+        half[free] = lu.solve(coupling @ half[~free].astype(float))
+        # add values to the right half of the grid
+        A[:, idx+1:] = np.flip(A[:, :idx], axis=1)
+        return {'iterations': 0, 'residuals': np.zeros(0), 'converged': True,
+                'time': time.perf_counter() - start}
+    
+    # P holds the left half plus one ghost node on each side,
+    # which mirrors the nodes next to the edge
+    # (Eq. 11.23 of Budhu (2007) at the boundaries)
+    P = np.pad(A[:, :idx+1].astype(float), 1, mode='reflect')
+    # interior of P (a view, so updates go into P)
+    U = P[1:-1, 1:-1]
+    # red and black nodes that must be solved
+    free = BC[:, :idx+1] == 0
+    i, j = np.indices(free.shape)
+    colors = [free & ((i + j) % 2 == 0), free & ((i + j) % 2 == 1)]
+    # spectral radius of the Jacobi iteration for a rectangle
+    # with mirrored edges, and optimal relaxation factor (Young, 1954)
+    rho = 0.5 * (np.cos(np.pi / (2 * U.shape[0])) +
+                 np.cos(np.pi / (2 * U.shape[1])))
+    if omega is None:
+        omega = 2.0 / (1.0 + np.sqrt(1.0 - rho**2))
+    
+    # initialize residual and counter
+    residual = np.inf
+    residuals = []
     counter = 0
-    # hold the old values of A
-    A_old = A.copy()
-    while difference > tolerance or counter < max_iter:
-        # the problem is symmetric, 
-        # so we solve only for the left half of the grid
-        for i in range(A.shape[0]):
-            for j in range(idx+1):
-                if BC[i, j] == 0:
-                    # solve the laplace equation using finite differences
-                    # Eq. 11.23 of Budhu (2007), Soil Mechanics and Foundations
-                    # left node
-                    if j == 0:
-                        left_nod = A[i, j+1]
-                    else:
-                        left_nod = A[i, j-1]
-                    # right node
-                    if j == idx:
-                        right_nod = A[i, j-1]
-                    else:
-                        right_nod = A[i, j+1]
-                    # top node
-                    if i == 0:
-                        top_nod = A[i+1, j]
-                    else:
-                        top_nod = A[i-1, j]
-                    # bottom node
-                    if i == A.shape[0]-1:
-                        bottom_nod = A[i-1, j]
-                    else:
-                        bottom_nod = A[i+1, j]
-                    A[i, j] = (left_nod + right_nod + top_nod + bottom_nod) / 4.0
-        # update the difference, old values, and counter
-        difference = np.max(np.abs(A - A_old))
-        A_old = A.copy()
+    while residual > tolerance and counter < max_iter:
+        for k, color in enumerate(colors):
+            # update the ghost nodes
+            P[0, :] = P[2, :]
+            P[-1, :] = P[-3, :]
+            P[:, 0] = P[:, 2]
+            P[:, -1] = P[:, -3]
+            # solve the laplace equation using finite differences
+            # Eq. 11.23 of Budhu (2007), Soil Mechanics and Foundations
+            R = (P[1:-1, :-2] + P[1:-1, 2:] + P[:-2, 1:-1] + 
+                 P[2:, 1:-1]) / 4.0 - U
+            # residual before the sweep
+            if k == 0:
+                residual = np.max(np.abs(R[free]), initial=0.0) / (1.0 - rho)
+                residuals.append(residual)
+            U[color] += omega * R[color]
         counter += 1
+        if callback is not None and callback(counter, residual):
+            break
     
+    # copy the solution back to A
+    A[:, :idx+1] = U
     # add values to the right half of the grid
     A[:, idx+1:] = np.flip(A[:, :idx], axis=1)
 
-def flow_net(H1, H2, H3, D, cell_size, Nd_up, Nf, grid_on=False):
+    return {'iterations': counter, 'residuals': np.array(residuals),
+            'converged': bool(residual <= tolerance),
+            'time': time.perf_counter() - start}
+
+def solve_flow_net(H1, H2, H3, D, cell_size, solver='sor', gamma_w=9.81,
+                   mesh='uniform', cache=None):
     '''
-    This function draws the flow net for the case
+    This function solves the flow net for the case
     of a sheet pile wall, horizontal layers, and
-    a permeable layer over an impermeable base.
+    a permeable layer over an impermeable base,
+    without drawing it.
     Based on Budhu (2007), Soil Mechanics and Foundations.
 
     Input:
@@ -71,17 +187,47 @@ def flow_net(H1, H2, H3, D, cell_size, Nd_up, Nf, grid_on=False):
     H3: Depth of wall penetration in the permeable layer
     D: Thickness of the permeable layer
     cell_size: Size of the cells in the flow net
-    Nd_up: Number of equipotential falls in upstream side of wall
-    Nf: Number of flow channels
-    grid_on: Boolean to show the grid, by default False
+    solver: Laplace equation solver, 'sor' (default) or 'direct',
+        see solve_laplace_equation
+    gamma_w: unit weight of water, kN/m3
+    mesh: 'uniform' (default) to solve on the grid of nodes
+        every cell_size, or 'graded' to solve on cells that are
+        cell_size/4 at the wall tip and the exit face and grow
+        to 2*cell_size away from them (see seepage_sol), and
+        interpolate the results to the grid. H3 does not have
+        to be on the grid, the grid has a node on the wall, 
+        and solver is not used
+    cache: ResultCache (see result_cache) to reuse the solutions
+        of the same parameters, by default None. The cached
+        arrays are read-only
 
     Output:
-    None, the flow net is displayed
+    X, Y: x and y (depth) coordinates of the grid
+    H: Head above the downstream water level, 
+        H1 - H2 upstream and 0 downstream of the wall
+    Q: Flow (stream function) values
+    q: Flow quantity, Eq. 11.32 of Budhu (2007)
+    i_exit: Maximum exit gradient at the downstream surface
+    u_wall: Pore water pressure along the wall, from the 
+        surface to the tip, 2 x n array with the upstream (row 0)
+        and downstream (row 1) faces, in kPa
 
     Notes: 
     H1 must be greater than H2
     H3 must be less than D
     '''
+    # make sure solver and mesh are valid, before
+    # solving or caching anything
+    if solver not in ['sor', 'direct']:
+        raise ValueError(f"solver must be either 'sor' or 'direct', not {solver!r}")
+    if mesh not in ['uniform', 'graded']:
+        raise ValueError(f"mesh must be either 'uniform' or 'graded', not {mesh!r}")
+    if cache is not None:
+        return cache.cached('solve_flow_net', solve_flow_net, H1, H2, H3, D,
+                            cell_size, solver, gamma_w, mesh)
+    if mesh == 'graded':
+        return _solve_graded_flow_net(H1, H2, H3, D, cell_size, gamma_w)
+
     # width of the flow net
     width = D * 4
     # head difference
@@ -113,7 +259,9 @@ def flow_net(H1, H2, H3, D, cell_size, Nd_up, Nf, grid_on=False):
     BC[idy:, idx] = 1
     H[idy:, idx] = delta_H/2.0
     # solve for the head values
-    solve_laplace_equation(H, BC, idx)
+    with profiling.phase('head solve'):
+        report = solve_laplace_equation(H, BC, idx, solver=solver)
+    _check_report('head solve', report)
 
     # Calculate the flow values
     # Eq. 11.32 of Budhu (2007), Soil Mechanics and Foundations
@@ -131,7 +279,188 @@ def flow_net(H1, H2, H3, D, cell_size, Nd_up, Nf, grid_on=False):
     BC[:idy+1, idx] = 1
     Q[:idy+1, idx] = 0.0
     # solve for the flow values
-    solve_laplace_equation(Q, BC, idx)
+    with profiling.phase('flow solve'):
+        report = solve_laplace_equation(Q, BC, idx, solver=solver)
+    _check_report('flow solve', report)
+
+    # the head is antisymmetric about the wall,
+    # so downstream it is delta_H minus the mirrored upstream head
+    H[:, idx+1:] = delta_H - H[:, idx+1:]
+
+    # exit gradient: vertical gradient at the downstream surface
+    i_exit = np.max(H[1, idx+1:] - H[0, idx+1:]) / cell_size
+
+    # pore water pressure along the faces of the wall,
+    # the elevation datum is the ground surface
+    u_wall = np.zeros((2, idy+1))
+    u_wall[0] = gamma_w * (H2 + H[:idy+1, idx] + y[:idy+1])
+    u_wall[1] = gamma_w * (H2 + delta_H - H[:idy+1, idx] + y[:idy+1])
+
+    return X, Y, H, Q, q, i_exit, u_wall
+
+def _solve_graded_flow_net(H1, H2, H3, D, cell_size, gamma_w):
+    '''
+    Solve the flow net of solve_flow_net on a graded mesh,
+    and interpolate the results to the grid of nodes
+    '''
+    from scipy.interpolate import RegularGridInterpolator
+    from seepage_sol import graded_faces, seepage
+
+    # width of the flow net
+    width = D * 4
+    # head difference
+    delta_H = H1 - H2
+    # cells refined at the wall (x) and at the surface and tip (y)
+    x_faces = graded_faces(0, width, [width/2.0], cell_size/4.0, 2.0*cell_size)
+    y_faces = graded_faces(0, D, [0, H3], cell_size/4.0, 2.0*cell_size)
+    # heads at the surface upstream and downstream of the wall
+    xc = (x_faces[:-1] + x_faces[1:]) / 2.0
+    top_head = np.where(xc < width/2.0, delta_H, 0.0)
+    with profiling.phase('graded solve'):
+        _, _, h, psi, q, i_exit = seepage(x_faces, y_faces, 1.0, 1.0, top_head,
+                                          [(width/2.0, 0.0, H3)])
+
+    # grid of nodes, with an even number of columns of cells
+    # so there is a node on the wall
+    x = np.linspace(0, width, 2 * max(1, int(round(width / (2*cell_size)))) + 1)
+    y = np.linspace(0, D, int(round(D / cell_size)) + 1)
+    X, Y = np.meshgrid(x, y)
+
+    with profiling.phase('interpolation'):
+        # the head jumps across the wall, so each side is interpolated
+        # from its own cells, and extrapolated to the wall and the edges
+        yc = (y_faces[:-1] + y_faces[1:]) / 2.0
+        left = xc < width/2.0
+        H = np.zeros(X.shape)
+        upstream = X <= width/2.0
+        def side(cells, points):
+            interpolator = RegularGridInterpolator((yc, xc[cells]), h[:, cells],
+                                                   bounds_error=False, fill_value=None)
+            return interpolator(points)
+        H[upstream] = side(left, np.column_stack((Y[upstream], X[upstream])))
+        H[~upstream] = side(~left, np.column_stack((Y[~upstream], X[~upstream])))
+        # heads at the surface, and below the wall, where 
+        # by antisymmetry the head is delta_H/2
+        H[0] = np.where(upstream[0], delta_H, 0.0)
+        H[(X == width/2.0) & (Y >= H3)] = delta_H/2.0
+        # stream function of Budhu (2007): q at the left and bottom,
+        # 0 at the wall
+        interpolator = RegularGridInterpolator((y_faces, x_faces), q - psi)
+        Q = interpolator(np.column_stack((Y.ravel(), X.ravel()))).reshape(X.shape)
+        # round off may put Q slightly outside 0 to q at the boundaries
+        Q = np.clip(Q, 0.0, q)
+
+        # pore water pressure along the faces of the wall
+        y_wall = y[y <= H3]
+        x_wall = np.full(y_wall.size, width/2.0)
+        points = np.column_stack((y_wall, x_wall))
+        u_wall = np.zeros((2, y_wall.size))
+        u_wall[0] = gamma_w * (H2 + side(left, points) + y_wall)
+        u_wall[1] = gamma_w * (H2 + side(~left, points) + y_wall)
+
+    return X, Y, H, Q, q, i_exit, u_wall
+
+def _check_report(name, report):
+    '''
+    Give a solver report to the active profilers,
+    and warn if the solver did not converge
+    '''
+    profiling.record(name, report)
+    if not report['converged']:
+        print(f"Warning: {name} did not converge in {report['iterations']} "
+              f"iterations, increase max_iter or cell_size")
+
+def _solve_flow_net_case(args):
+    '''
+    Solve one case of flow_net_sweep in a worker process
+    '''
+    H1, H2, H3, D, cell_size, solver, gamma_w, mesh = args
+    return solve_flow_net(H1, H2, H3, D, cell_size, solver, gamma_w, mesh)
+
+def flow_net_sweep(H1, H2, H3, D, cell_size, solver='direct', gamma_w=9.81,
+                   max_workers=None, mesh='uniform'):
+    '''
+    This function solves many flow nets in parallel,
+    on a pool of processes. The cases are the broadcast
+    of the H1, H2, H3, D and cell_size arrays.
+
+    Input:
+    H1, H2, H3, D, cell_size: arrays (or scalars) with the 
+        parameters of solve_flow_net
+    solver: Laplace equation solver, 'direct' (default) or 'sor'
+    gamma_w: unit weight of water, kN/m3
+    max_workers: Number of processes, by default None 
+        which uses all the cores
+    mesh: 'uniform' (default) or 'graded', see solve_flow_net
+
+    Output:
+    Generator of (index, result) pairs, in the order in which 
+    the cases finish. index is the position of the case in the 
+    broadcast arrays and result is the output of solve_flow_net.
+    If the generator is closed early (e.g. break), the cases 
+    that did not start are cancelled
+    '''
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    # broadcast the parameters
+    H1, H2, H3, D, cell_size = np.broadcast_arrays(H1, H2, H3, D, cell_size)
+
+    executor = ProcessPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {}
+        for index in np.ndindex(H1.shape):
+            args = (H1[index], H2[index], H3[index], D[index], 
+                    cell_size[index], solver, gamma_w, mesh)
+            futures[executor.submit(_solve_flow_net_case, args)] = index
+        # stream the results as they finish
+        for future in as_completed(futures):
+            yield futures[future], future.result()
+    finally:
+        # if the caller stops early, do not wait for the
+        # cases that did not start
+        executor.shutdown(cancel_futures=True)
+
+def flow_net(H1, H2, H3, D, cell_size, Nd_up, Nf, grid_on=False, solver='sor',
+             mesh='uniform', cache=None):
+    '''
+    This function draws the flow net for the case
+    of a sheet pile wall, horizontal layers, and
+    a permeable layer over an impermeable base.
+    Based on Budhu (2007), Soil Mechanics and Foundations.
+
+    Input:
+    H1: Height of water column in upstream side of wall
+    H2: Height of water column in downstream side of wall
+    H3: Depth of wall penetration in the permeable layer
+    D: Thickness of the permeable layer
+    cell_size: Size of the cells in the flow net
+    Nd_up: Number of equipotential falls in upstream side of wall
+    Nf: Number of flow channels
+    grid_on: Boolean to show the grid, by default False
+    solver: Laplace equation solver, 'sor' (default) or 'direct',
+        see solve_laplace_equation
+    mesh: 'uniform' (default) or 'graded', see solve_flow_net
+    cache: ResultCache to reuse the solutions, by default None,
+        see solve_flow_net
+
+    Output:
+    None, the flow net is displayed
+
+    Notes: 
+    H1 must be greater than H2
+    H3 must be less than D
+    '''
+    # width of the flow net
+    width = D * 4
+    # head difference
+    delta_H = H1 - H2
+    # solve the flow net
+    X, Y, H, Q, q, i_exit, u_wall = solve_flow_net(H1, H2, H3, D, cell_size,
+                                                   solver, mesh=mesh, cache=cache)
+    # the equipotential lines downstream are the mirror images
+    # of those upstream, by antisymmetry the head of the mirrored
+    # point is delta_H - H
+    H = np.where(X > width/2.0, delta_H - H, H)
     
     # figure
     fig, ax = plt.subplots(figsize=(10, 5))
@@ -159,12 +488,13 @@ def flow_net(H1, H2, H3, D, cell_size, Nd_up, Nf, grid_on=False):
         for i in range(Y.shape[1]):
             ax.plot(X[:, i], Y[:, i], 'lightgray')
 
-    # draw the equipotential lines: contours of H
-    c_levels = np.linspace(delta_H/2.0, delta_H, int(Nd_up)+1)
-    ax.contour(X, Y, H, c_levels, colors='green')
-    # draw the flow channels: contours of Q
-    c_levels = np.linspace(0, q, int(Nf)+1)
-    ax.contour(X, Y, Q, c_levels, colors='red')
+    with profiling.phase('contouring'):
+        # draw the equipotential lines: contours of H
+        c_levels = np.linspace(delta_H/2.0, delta_H, int(Nd_up)+1)
+        ax.contour(X, Y, H, c_levels, colors='green')
+        # draw the flow channels: contours of Q
+        c_levels = np.linspace(0, q, int(Nf)+1)
+        ax.contour(X, Y, Q, c_levels, colors='red')
 
     # draw the wall
     ax.plot([width/2.0, width/2.0], [-1.25*H1, H3], 'k', lw=2)
@@ -173,4 +503,5 @@ def flow_net(H1, H2, H3, D, cell_size, Nd_up, Nf, grid_on=False):
     ax.plot([0.0, D/2.0], [1.25*D, 1.25*D], 'k', lw=2)
     ax.text(D/4.0, 1.2*D, f'{D/2:.0f} m', ha='center', va='center')
 
-    plt.show()
\ No newline at end of file
+    with profiling.phase('show'):
+        plt.show()
\ No newline at end of file
@@ -1,5 +1,8 @@
 import numpy as np
 import matplotlib.patches as patches
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from concurrent.futures import ProcessPoolExecutor
 
 def grain_size_chart(fig, ax, English=False):
     """
@@ -151,3 +154,105 @@ def grain_size_chart(fig, ax, English=False):
         ax_band.add_patch(rect)
         ax_band.text(np.sqrt(x0 * x1), 0.575, label, ha="center",
                     va="center", fontsize=9)
+
+class GradationRenderer:
+    """
+    Grain size chart that is built once and reused
+    to draw the gradation curve of many samples.
+    Only the curve and the legend change between samples.
+    The figure is not managed by pyplot, so it is not
+    displayed and it does not need to be closed.
+    """
+
+    def __init__(self, English=False, figsize=(13.5, 6.5)):
+        """
+        Build the chart background
+        INPUT:
+            English : bool, optional
+                If True, use English labels
+                If False, use Norwegian labels (default)
+            figsize : figure size in inches
+        """
+        self.fig = Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        grain_size_chart(self.fig, self.ax, English)
+        # curve of the sample, updated by render
+        self.line, = self.ax.plot([], [], '*-', color='black')
+        # the bounding box of the chart (including the header band)
+        # does not change between samples, compute it once
+        self.fig.canvas.draw()
+        renderer = self.fig.canvas.get_renderer()
+        self.bbox = self.fig.get_tightbbox(renderer).padded(0.1)
+
+    def render(self, sizes, passing, filename, label=None):
+        """
+        Draw the gradation curve of one sample
+        and save the figure
+        INPUT:
+            sizes : array of grain sizes in mm
+            passing : array of percent passing
+            filename : name of the file, the format is given
+                by the extension, e.g. .png or .pdf
+            label : label of the curve in the legend, optional
+        OUTPUT:
+            filename
+        """
+        self.line.set_data(sizes, passing)
+        # the label and legend of the previous sample are replaced
+        self.line.set_label(label or '_nolegend_')
+        if label:
+            self.ax.legend()
+        elif self.ax.get_legend() is not None:
+            self.ax.get_legend().remove()
+        self.fig.savefig(filename, bbox_inches=self.bbox)
+        return filename
+
+# renderer of each worker process of export_gradation_charts
+_renderer = None
+
+def _init_renderer(English, figsize):
+    """
+    Build the chart once in each worker process
+    """
+    global _renderer
+    _renderer = GradationRenderer(English, figsize)
+
+def _render_sample(args):
+    """
+    Render one sample in a worker process
+    """
+    return _renderer.render(*args)
+
+def export_gradation_charts(sizes, passing, filenames, labels=None,
+                            English=False, figsize=(13.5, 6.5),
+                            max_workers=None):
+    """
+    Write one grain size chart per sample, on a pool of
+    processes. Each process builds the chart once and
+    reuses it for all its samples
+    INPUT:
+        sizes : array of grain sizes in mm, common to all samples
+        passing : samples x sizes array of percent passing,
+            e.g. from grain_size_sol.sieve_analysis
+        filenames : list with one file name per sample,
+            the format is given by the extension (.png, .pdf)
+        labels : list with one legend label per sample, optional
+        English : bool, optional
+            If True, use English labels
+            If False, use Norwegian labels (default)
+        figsize : figure size in inches
+        max_workers : number of processes, by default None
+            which uses all the cores
+    OUTPUT:
+        list of the written file names
+    """
+    if labels is None:
+        labels = [None] * len(filenames)
+    tasks = [(sizes, passing[i], filenames[i], labels[i]) 
+             for i in range(len(filenames))]
+    with ProcessPoolExecutor(max_workers=max_workers, 
+                             initializer=_init_renderer,
+                             initargs=(English, figsize)) as executor:
+        return list(executor.map(_render_sample, tasks, 
+                                 chunksize=max(1, len(tasks) // 64)))
@@ -0,0 +1,123 @@
+import numpy as np
+
+# grain size boundaries in mm between clay, silt, sand,
+# gravel and cobbles, as in grain_size_chart
+boundaries = [0.002, 0.06, 2.0, 60.0]
+fraction_names = ['clay', 'silt', 'sand', 'gravel', 'cobbles']
+
+def _interp_rows(x, xp, fp):
+    '''
+    Linear interpolation of each row of fp at x,
+    where each row of xp is non-decreasing.
+    Values outside xp take the end values of fp,
+    as in np.interp
+    '''
+    n = xp.shape[1]
+    x = np.asarray(x, dtype=float)
+    # first index where xp >= x
+    idx = np.sum(xp < x[:, None], axis=1)
+    i = np.clip(idx, 1, n - 1)
+    rows = np.arange(xp.shape[0])
+    x0, x1 = xp[rows, i - 1], xp[rows, i]
+    f0, f1 = fp[rows, i - 1], fp[rows, i]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t = np.where(x1 > x0, (x - x0) / (x1 - x0), 1.0)
+    f = f0 + np.clip(t, 0.0, 1.0) * (f1 - f0)
+    # clamp outside the range
+    f = np.where(idx == 0, fp[:, 0], f)
+    f = np.where(idx == n, fp[:, -1], f)
+    return f
+
+def sieve_analysis(sizes, masses, log_scale=False, boundaries=boundaries):
+    '''
+    Grain size analysis of many samples at once
+
+    Input:
+    sizes: array of sieve sizes in mm, in decreasing order
+    masses: samples x (sieves + 1) array with the soil mass
+        retained in each sieve, the last column is the pan
+    log_scale: Boolean to interpolate in log of the grain size,
+        by default False, which interpolates linearly in mm
+        as in the grain size notebook
+    boundaries: grain size boundaries in mm between clay, silt, 
+        sand, gravel and cobbles, by default those of 
+        grain_size_chart. The grain size notebook uses 0.063 mm
+        between silt and sand
+
+    Output:
+    Dictionary with the following keys, one value per sample:
+    'passing': samples x sieves array of percent passing
+    'D10', 'D30', 'D60': grain sizes in mm at 10, 30
+        and 60 % passing, NaN if the percent is not within
+        the passing of the smallest and largest sieves
+    'Cu': coefficient of uniformity D60/D10, NaN if unknown
+    'Cc': coefficient of curvature D30^2/(D10*D60), NaN if unknown
+    'clay', 'silt', 'sand', 'gravel', 'cobbles': percentages
+        of each fraction.
+        All the soil is finer than the largest sieve, and the pan
+        is in the fraction below the smallest sieve. The fractions 
+        below that one are not measured by the sieves, they are NaN
+    'soil': name of the largest fraction
+    'well_graded': Boolean, Cc between 1 and 3 and Cu >= 4
+        for gravels or Cu >= 6 for the other soils,
+        False if Cu or Cc is unknown
+    '''
+    sizes = np.asarray(sizes, dtype=float)
+    masses = np.atleast_2d(np.asarray(masses, dtype=float))
+    n_samples = masses.shape[0]
+
+    # compute percent passing
+    total = np.sum(masses, axis=1, keepdims=True)
+    passing = 100 * (1 - np.cumsum(masses[:, :-1], axis=1) / total)
+
+    # grain sizes and passing in increasing order
+    x = sizes[::-1]
+    if log_scale:
+        x = np.log10(x)
+    p = passing[:, ::-1]
+    xs = np.broadcast_to(x, p.shape)
+
+    results = {'passing': passing}
+
+    # grain sizes at 10, 30 and 60 % passing
+    for percent in [10, 30, 60]:
+        D = _interp_rows(np.full(n_samples, percent), p, xs)
+        # not measured if the percent is outside the curve
+        D[(percent < p[:, 0]) | (percent > p[:, -1])] = np.nan
+        results[f'D{percent}'] = 10**D if log_scale else D
+    results['Cu'] = results['D60'] / results['D10']
+    results['Cc'] = results['D30']**2 / (results['D10'] * results['D60'])
+
+    # percent passing at the boundaries, and fractions
+    # from the differences between boundaries. The pan is below
+    # the largest boundary that is not above the smallest sieve,
+    # the boundaries below that one split the pan in unknown parts
+    below = [b for b in boundaries if b <= sizes.min()]
+    passing_at = [np.zeros(n_samples)]
+    for b in boundaries:
+        if b > sizes.max():
+            # the soil passes the largest sieve
+            passing_at.append(np.full(n_samples, 100.0))
+        elif below and b == below[-1]:
+            passing_at.append(p[:, 0])
+        elif below and b < below[-1]:
+            passing_at.append(np.zeros(n_samples))
+        else:
+            xb = np.log10(b) if log_scale else b
+            passing_at.append(_interp_rows(np.full(n_samples, xb), xs, p))
+    passing_at.append(np.full(n_samples, 100.0))
+    for i, name in enumerate(fraction_names):
+        results[name] = passing_at[i+1] - passing_at[i]
+        if below and i < len(boundaries) and boundaries[i] < below[-1]:
+            results[name] = np.full(n_samples, np.nan)
+
+    # largest fraction and gradation
+    fractions = np.stack([results[name] for name in fraction_names])
+    fractions = np.nan_to_num(fractions, nan=-1.0)
+    results['soil'] = np.array(fraction_names)[np.argmax(fractions, axis=0)]
+    cu_min = np.where(results['soil'] == 'gravel', 4, 6)
+    known = ~(np.isnan(results['Cu']) | np.isnan(results['Cc']))
+    results['well_graded'] = (known & (results['Cc'] >= 1) & 
+                              (results['Cc'] <= 3) & (results['Cu'] >= cu_min))
+
+    return results
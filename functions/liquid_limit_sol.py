@@ -0,0 +1,103 @@
+import numpy as np
+
+def liquid_limits(sample, n, w, n_liquid=25):
+    '''
+    Liquid limit of many samples by Casagrande's method.
+    The tests of all the samples are given in flat arrays,
+    one value per test, and each sample can have a different
+    number of tests. For each sample a line is fitted by least
+    squares to w vs log(n), and evaluated at n_liquid blows.
+    Samples with a single test use the one-point method
+    w_L = w * (n / n_liquid)^0.121
+
+    Input:
+    sample: array with the sample id of each test
+    n: array with the number of blows of each test
+    w: array with the water content (%) of each test
+    n_liquid: number of blows at the liquid limit, by default 25
+
+    Output:
+    samples: array of sorted unique sample ids
+    w_l: array of liquid limits (%), one per sample
+    slope: array of slopes of the fitted lines, dw/dlog(n),
+        NaN for the samples with a single test
+    '''
+    samples, index = np.unique(sample, return_inverse=True)
+    x = np.log(np.asarray(n, dtype=float))
+    y = np.asarray(w, dtype=float)
+
+    # sums for the least squares fit of each sample
+    length = len(samples)
+    count = np.bincount(index, minlength=length).astype(float)
+    sx = np.bincount(index, x, length)
+    sy = np.bincount(index, y, length)
+    sxx = np.bincount(index, x*x, length)
+    sxy = np.bincount(index, x*y, length)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (count * sxy - sx * sy) / (count * sxx - sx**2)
+        intercept = (sy - slope * sx) / count
+        w_l = slope * np.log(n_liquid) + intercept
+
+    # one-point method, x and y are the values of the single test
+    one_point = count == 1
+    slope[one_point] = np.nan
+    w_l[one_point] = (sy[one_point] *
+                      (np.exp(sx[one_point]) / n_liquid)**0.121)
+
+    return samples, w_l, slope
+
+def plasticity_chart(w_l, I_p):
+    '''
+    Classify fine soils in Casagrande's plasticity chart.
+    The A-line is I_p = 0.73 (w_L - 20) and the
+    U-line is I_p = 0.9 (w_L - 8)
+
+    Input:
+    w_l: array of liquid limits (%)
+    I_p: array of plasticity indices (%)
+
+    Output:
+    soil_class: array with the class of each soil:
+        'CL', 'CH' (clays, on or above the A-line),
+        'ML', 'MH' (silts, below the A-line),
+        'CL-ML' (I_p between 4 and 7, on or above the A-line)
+    above_u_line: Boolean array, True for soils above the U-line,
+        which is the upper limit of real soils, so the
+        results should be checked
+    '''
+    w_l = np.asarray(w_l, dtype=float)
+    I_p = np.asarray(I_p, dtype=float)
+    a_line = 0.73 * (w_l - 20)
+    u_line = 0.9 * (w_l - 8)
+
+    clay = (I_p >= a_line) & (I_p > 7)
+    silt_clay = (I_p >= a_line) & (I_p >= 4) & (I_p <= 7)
+    high = w_l >= 50
+    soil_class = np.select(
+        [silt_clay, clay & high, clay, high],
+        ['CL-ML', 'CH', 'CL', 'MH'], default='ML')
+    above_u_line = I_p > u_line
+    return soil_class, above_u_line
+
+def atterberg_limits(sample, n, w, w_p, n_liquid=25):
+    '''
+    Liquid limit, plasticity index and plasticity chart
+    class of many samples, see liquid_limits and
+    plasticity_chart
+
+    Input:
+    sample, n, w, n_liquid: tests as in liquid_limits
+    w_p: array of plastic limits (%), one per sample
+        in the order of the sorted unique sample ids,
+        or a single value for all the samples
+
+    Output:
+    Dictionary with the keys 'sample', 'w_l', 'slope',
+    'I_p', 'class' and 'above_u_line', one value per sample
+    '''
+    samples, w_l, slope = liquid_limits(sample, n, w, n_liquid)
+    I_p = w_l - np.asarray(w_p, dtype=float)
+    soil_class, above_u_line = plasticity_chart(w_l, I_p)
+    return {'sample': samples, 'w_l': w_l, 'slope': slope, 'I_p': I_p,
+            'class': soil_class, 'above_u_line': above_u_line}
@@ -0,0 +1,72 @@
+import numpy as np
+
+def mohr_circles(sx, sz, txz):
+    '''
+    Compute the Mohr circles of many stress states
+    in closed form. Compressive stresses are positive.
+    The shear stress follows the convention of the
+    Mohr circle notebook: the point of the x plane is
+    (sx, txz) and the point of the z plane is (sz, -txz).
+
+    Input:
+    sx: normal stress on the x plane (kPa)
+    sz: normal stress on the z plane (kPa)
+    txz: shear stress on the x plane (kPa)
+    All inputs can be scalars or arrays that broadcast
+
+    Output:
+    center: center of the circles on the sigma axis (kPa)
+    radius: radius of the circles (kPa),
+        which is also the maximum shear stress
+    s1: major principal stress (kPa)
+    s3: minor principal stress (kPa)
+    theta: angle of the s1 direction from the x axis in radians,
+        between -pi/2 and pi/2. s3 is at theta + pi/2
+    pole_planes: (sigma, tau) coordinates of the pole
+        to planes, array with first dimension 2
+    pole_normals: (sigma, tau) coordinates of the pole
+        to normals, array with first dimension 2
+    '''
+    sx, sz, txz = np.broadcast_arrays(sx, sz, txz)
+
+    # center and radius
+    center = (sx + sz) / 2.0
+    radius = np.hypot((sx - sz) / 2.0, txz)
+    # principal stresses
+    s1 = center + radius
+    s3 = center - radius
+    # direction of s1, the line from the pole to normals to s1
+    theta = 0.5 * np.arctan2(-2.0 * txz, sx - sz)
+    # the pole to planes is at the end of the vertical chord
+    # from the x plane, and the pole to normals at the end
+    # of the horizontal chord
+    pole_planes = np.stack((sx, -txz))
+    pole_normals = np.stack((sz, txz))
+
+    return center, radius, s1, s3, theta, pole_planes, pole_normals
+
+def stresses_on_plane(sx, sz, txz, angle):
+    '''
+    Compute the normal and shear stresses on planes
+    whose normals make an angle with the x axis,
+    for many stress states. The conventions are
+    the same as in mohr_circles
+
+    Input:
+    sx: normal stress on the x plane (kPa)
+    sz: normal stress on the z plane (kPa)
+    txz: shear stress on the x plane (kPa)
+    angle: angle of the plane normal from the x axis in radians
+    All inputs can be scalars or arrays that broadcast
+
+    Output:
+    sn: normal stress on the planes (kPa)
+    tn: shear stress on the planes (kPa)
+    '''
+    center = (sx + sz) / 2.0
+    half_diff = (sx - sz) / 2.0
+    # rotate the point of the x plane by twice the angle
+    # about the center of the circle
+    sn = center + half_diff * np.cos(2*angle) - txz * np.sin(2*angle)
+    tn = half_diff * np.sin(2*angle) + txz * np.cos(2*angle)
+    return sn, tn
@@ -0,0 +1,168 @@
+import numpy as np
+
+# reference stress of the modulus number: atmospheric pressure, kPa
+sigma_ref = 100
+
+def read_oedometer_test(filename, height):
+    '''
+    Read a raw oedometer test file, one line per load step.
+    Each line has the effective vertical stress (kPa) followed
+    by the dial readings of the settlement (mm) during the step,
+    separated by commas or spaces. The number of readings can
+    change from step to step, and the last reading is taken as
+    the settlement at the end of the step. Empty lines and
+    lines starting with # are skipped.
+    The file is read line by line, so it is not held in memory.
+
+    Input:
+    filename: name of the file
+    height: initial height of the sample in mm
+
+    Output:
+    sigma: array of stresses at the end of the steps (kPa)
+    epsilon: array of strains at the end of the steps
+    '''
+    sigma = []
+    delta = []
+    with open(filename) as file:
+        for line in file:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            values = line.replace(',', ' ').split()
+            sigma.append(float(values[0]))
+            delta.append(float(values[-1]) if len(values) > 1 else np.nan)
+    return np.array(sigma), np.array(delta) / height
+
+def read_oedometer_tests(filenames, heights):
+    '''
+    Read many oedometer test files, see read_oedometer_test,
+    into 2D arrays with one test per row. Tests with fewer
+    load steps are padded at the end with NaN
+
+    Input:
+    filenames: list of file names
+    heights: initial heights of the samples in mm,
+        one per file or a single value for all the files
+
+    Output:
+    sigma: tests x steps array of stresses (kPa)
+    epsilon: tests x steps array of strains
+    '''
+    heights = np.broadcast_to(np.asarray(heights, dtype=float),
+                              (len(filenames),))
+    tests = [read_oedometer_test(f, h) for f, h in zip(filenames, heights)]
+    n_steps = max(len(s) for s, e in tests)
+    sigma = np.full((len(tests), n_steps), np.nan)
+    epsilon = np.full((len(tests), n_steps), np.nan)
+    for i, (s, e) in enumerate(tests):
+        sigma[i, :len(s)] = s
+        epsilon[i, :len(e)] = e
+    return sigma, epsilon
+
+def oedometer_tests(sigma, epsilon):
+    '''
+    Interpret many oedometer tests at once. The tangent
+    modulus M of each load step is d_sigma / d_epsilon, and
+    is plotted at the stress at the end of the step.
+    A bilinear model is fitted by least squares to the
+    M - sigma' points of each test: a constant modulus M_oc
+    in the overconsolidated (OC) branch, and a line
+    M = m (sigma' - sigma_r) in the normally consolidated
+    (NC) branch. The break between the branches is found
+    by trying all the breaks with at least two points in
+    each branch, and the preconsolidation stress sigma_c is
+    the stress of the last point of the OC branch
+
+    Input:
+    sigma: tests x steps array of effective vertical stresses (kPa),
+        or a 1D array for a single test
+    epsilon: tests x steps array of strains
+    Tests with fewer steps are padded at the end with NaN
+
+    Output:
+    Dictionary with the following keys, one value per test:
+    'M': tests x (steps - 1) array of tangent moduli (kPa)
+    'sigma_M': tests x (steps - 1) array of the stresses of M (kPa)
+    'n_oc': number of points of M in the OC branch
+    'sigma_c': preconsolidation stress (kPa)
+    'M_oc': constrained modulus of the OC branch (kPa)
+    'm_oc': modulus number of the OC branch, M_oc / sigma_ref
+    'm_nc': modulus number of the NC branch, the slope of M
+    'sigma_r': reference stress of the NC branch (kPa)
+    Tests with fewer than four points of M give NaN
+    '''
+    sigma = np.atleast_2d(np.asarray(sigma, dtype=float))
+    epsilon = np.atleast_2d(np.asarray(epsilon, dtype=float))
+    n_tests = sigma.shape[0]
+
+    # tangent modulus of each step
+    with np.errstate(divide='ignore', invalid='ignore'):
+        M = np.diff(sigma, axis=1) / np.diff(epsilon, axis=1)
+    sigma_M = sigma[:, 1:]
+    valid = np.isfinite(M) & np.isfinite(sigma_M)
+    x = np.where(valid, sigma_M, 0.0)
+    y = np.where(valid, M, 0.0)
+
+    # sums of the first k points (OC branch) for all breaks k,
+    # the NC branch has the remaining points
+    def sums(values):
+        prefix = np.cumsum(values, axis=1)
+        return prefix, prefix[:, -1:] - prefix
+    n1, n2 = sums(valid.astype(float))
+    y1, y2 = sums(y)
+    yy1, yy2 = sums(y*y)
+    x1, x2 = sums(x)
+    xx1, xx2 = sums(x*x)
+    xy1, xy2 = sums(x*y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # squared errors of the constant and the line
+        error_oc = yy1 - y1**2 / n1
+        sxx = xx2 - x2**2 / n2
+        sxy = xy2 - x2 * y2 / n2
+        error_nc = yy2 - y2**2 / n2 - sxy**2 / sxx
+        error = error_oc + error_nc
+    # breaks with at least two points in each branch
+    error = np.where(valid & (n1 >= 2) & (n2 >= 2) & (sxx > 0), error, np.inf)
+
+    # best break of each test
+    k = np.argmin(error, axis=1)
+    rows = np.arange(n_tests)
+    found = np.isfinite(error[rows, k])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        M_oc = y1[rows, k] / n1[rows, k]
+        m_nc = sxy[rows, k] / sxx[rows, k]
+        # M = m_nc * (sigma - sigma_r) passes through the mean point
+        sigma_r = x2[rows, k] / n2[rows, k] - y2[rows, k] / (n2[rows, k] * m_nc)
+    sigma_c = sigma_M[rows, k]
+
+    results = {'M': M, 'sigma_M': sigma_M,
+               'n_oc': np.where(found, n1[rows, k], 0).astype(int)}
+    for name, values in [('sigma_c', sigma_c), ('M_oc', M_oc),
+                         ('m_oc', M_oc / sigma_ref), ('m_nc', m_nc),
+                         ('sigma_r', sigma_r)]:
+        results[name] = np.where(found, values, np.nan)
+    return results
+
+def vert_strain_parameters(results, sigma_0):
+    '''
+    Modulus numbers and models of settlements_sol.vert_strain
+    from interpreted oedometer tests. Soils with an initial
+    stress below the preconsolidation stress are OC (model 1,
+    with m_oc), and the others are NC (model 3, with m_nc).
+    Notice that model 3 of vert_strain assumes sigma_r = 0
+
+    Input:
+    results: dictionary returned by oedometer_tests
+    sigma_0: initial effective vertical stress (kPa) of the
+        soil of each test, or a single value
+
+    Output:
+    modulus: array of modulus numbers, one per test
+    model: array of models, one per test
+    '''
+    oc = np.asarray(sigma_0) < results['sigma_c']
+    modulus = np.where(oc, results['m_oc'], results['m_nc'])
+    model = np.where(oc, 1, 3)
+    return modulus, model
@@ -1,3 +1,5 @@
+import numpy as np
+
 def e_from_porosity(n):
     '''
     Calculate void ratio from porosity
@@ -41,4 +43,101 @@ def porosity_from_gamma(gamma, gamma_s, w):
     unit weight of solids, and water content
     '''
     n = 1 - (gamma / (gamma_s * (1 + w)))
-    return n
\ No newline at end of file
+    return n
+
+# relations used by solve_phase_relations:
+# (quantity, quantities it is computed from, formula)
+_phase_rules = [
+    ('e', ('n',), lambda n: n / (1 - n)),
+    ('n', ('e',), lambda e: e / (1 + e)),
+    ('G_s', ('gamma_s', 'gamma_w'), lambda gamma_s, gamma_w: gamma_s / gamma_w),
+    ('gamma_s', ('G_s', 'gamma_w'), lambda G_s, gamma_w: G_s * gamma_w),
+    ('gamma_d', ('gamma_s', 'e'), lambda gamma_s, e: gamma_s / (1 + e)),
+    ('e', ('gamma_s', 'gamma_d'), lambda gamma_s, gamma_d: gamma_s / gamma_d - 1),
+    ('gamma_s', ('gamma_d', 'e'), lambda gamma_d, e: gamma_d * (1 + e)),
+    ('gamma', ('gamma_d', 'w'), lambda gamma_d, w: gamma_d * (1 + w)),
+    ('gamma_d', ('gamma', 'w'), lambda gamma, w: gamma / (1 + w)),
+    ('w', ('gamma', 'gamma_d'), lambda gamma, gamma_d: gamma / gamma_d - 1),
+    ('e', ('w', 'G_s', 'S_r'), lambda w, G_s, S_r: w * G_s / S_r),
+    ('S_r', ('w', 'G_s', 'e'), lambda w, G_s, e: w * G_s / e),
+    ('w', ('S_r', 'e', 'G_s'), lambda S_r, e, G_s: S_r * e / G_s),
+    ('G_s', ('S_r', 'e', 'w'), lambda S_r, e, w: S_r * e / w),
+    # gamma = gamma_w * (G_s + S_r * e) / (1 + e)
+    ('e', ('gamma', 'G_s', 'S_r', 'gamma_w'), 
+     lambda gamma, G_s, S_r, gamma_w: (G_s * gamma_w - gamma) / (gamma - S_r * gamma_w)),
+    ('S_r', ('gamma', 'G_s', 'e', 'gamma_w'), 
+     lambda gamma, G_s, e, gamma_w: (gamma * (1 + e) / gamma_w - G_s) / e),
+    ('G_s', ('gamma', 'S_r', 'e', 'gamma_w'), 
+     lambda gamma, S_r, e, gamma_w: gamma * (1 + e) / gamma_w - S_r * e),
+]
+
+def solve_phase_relations(e=None, n=None, w=None, S_r=None, gamma=None,
+                          gamma_d=None, gamma_s=None, G_s=None, 
+                          gamma_w=9.81, rtol=1e-3):
+    '''
+    Calculate all the phase relations from any 
+    sufficient subset of them. The inputs can be scalars 
+    or arrays that broadcast (e.g. one value per sample), 
+    and missing values can be given as None or NaN.
+    Quantities that cannot be determined stay NaN
+
+    Input:
+    e: void ratio
+    n: porosity
+    w: water content
+    S_r: saturation
+    gamma: unit weight
+    gamma_d: dry unit weight
+    gamma_s: unit weight of solids
+    G_s: specific gravity of solids
+    gamma_w: unit weight of water
+    rtol: relative tolerance of the consistency check
+
+    Output:
+    Dictionary with the keys e, n, w, S_r, gamma, gamma_d, 
+    gamma_s and G_s, and the key consistent, which is False
+    where the inputs do not satisfy the phase relations or 
+    give values out of range (e < 0, n or S_r out of [0, 1])
+    '''
+    names = ['e', 'n', 'w', 'S_r', 'gamma', 'gamma_d', 'gamma_s', 'G_s']
+    values = [e, n, w, S_r, gamma, gamma_d, gamma_s, G_s]
+    values = [np.nan if v is None else v for v in values]
+    arrays = np.broadcast_arrays(*[np.asarray(v, dtype=float) for v in values])
+    q = {name: array.copy() for name, array in zip(names, arrays)}
+    q['gamma_w'] = np.full(arrays[0].shape, float(gamma_w))
+
+    # fill the missing values until nothing changes
+    with np.errstate(divide='ignore', invalid='ignore'):
+        changed = True
+        while changed:
+            changed = False
+            for target, inputs, formula in _phase_rules:
+                missing = np.isnan(q[target])
+                if not missing.any():
+                    continue
+                value = formula(*[q[name] for name in inputs])
+                fill = missing & np.isfinite(value)
+                if fill.any():
+                    q[target][fill] = value[fill]
+                    changed = True
+
+        # check the relations where all their quantities are known
+        consistent = np.ones(arrays[0].shape, dtype=bool)
+        checks = [
+            (q['n'], q['e'] / (1 + q['e'])),
+            (q['gamma_s'], q['G_s'] * q['gamma_w']),
+            (q['gamma_d'], q['gamma_s'] / (1 + q['e'])),
+            (q['gamma'], q['gamma_d'] * (1 + q['w'])),
+            (q['S_r'] * q['e'], q['w'] * q['G_s']),
+        ]
+        for a, b in checks:
+            known = np.isfinite(a) & np.isfinite(b)
+            consistent &= ~known | np.isclose(a, b, rtol=rtol, atol=1e-12)
+    # values out of range
+    consistent &= ~(q['e'] < 0)
+    consistent &= ~((q['n'] < 0) | (q['n'] > 1))
+    consistent &= ~((q['S_r'] < 0) | (q['S_r'] > 1 + rtol))
+
+    results = {name: q[name][()] for name in names}
+    results['consistent'] = consistent[()]
+    return results
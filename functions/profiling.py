@@ -0,0 +1,78 @@
+import time
+from contextlib import contextmanager
+
+# profilers that are collecting, the innermost is the last
+_active = []
+
+class Profiler:
+    '''
+    Collect the wall time of the phases of the functions
+    and the reports of the solvers called inside a with block:
+
+    with Profiler() as profiler:
+        flow_net(...)
+    profiler.print_report()
+
+    Functions mark their phases with profiling.phase,
+    which does nothing when no profiler is collecting
+    '''
+
+    def __init__(self):
+        '''
+        Start with no timings and no reports
+        '''
+        # phase name: [total time in seconds, number of calls]
+        self.timings = {}
+        # (name, report) pairs, in the order they were recorded
+        self.reports = []
+
+    def add_time(self, name, seconds):
+        '''
+        Add the time of one call of a phase
+        '''
+        total = self.timings.setdefault(name, [0.0, 0])
+        total[0] += seconds
+        total[1] += 1
+
+    def print_report(self):
+        '''
+        Print the timings of the phases and the solver reports
+        '''
+        print('Phase                          Time (s)  Calls')
+        print('----------------------------------------------')
+        for name, (seconds, calls) in self.timings.items():
+            print(f'{name:28s} {seconds:10.4f} {calls:6d}')
+        for name, report in self.reports:
+            status = 'converged' if report['converged'] else 'NOT converged'
+            print(f'{name}: {report["iterations"]} iterations, {status}, '
+                  f'{report["time"]:.4f} s')
+
+    def __enter__(self):
+        _active.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _active.remove(self)
+
+@contextmanager
+def phase(name):
+    '''
+    Time a phase of a function for the active profilers
+    '''
+    if not _active:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        for profiler in _active:
+            profiler.add_time(name, seconds)
+
+def record(name, report):
+    '''
+    Give the report of a solver to the active profilers
+    '''
+    for profiler in _active:
+        profiler.reports.append((name, report))
@@ -1,4 +1,9 @@
 import numpy as np
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+# number of cells of each axis of the I3 table, see I3_table
+table_size = 256
 
 def stress_at_corner(m, n, load):
     '''
@@ -9,6 +14,7 @@ def stress_at_corner(m, n, load):
     m: rectangle_width/depth_of_point
     n: rectangle_length/depth_of_point
     load: load on the rectangle in kN/m^2
+    m, n and load can be scalars or arrays that broadcast
     
     Output:
     vertical stress at the corner in kN/m^2
@@ -20,11 +26,9 @@ def stress_at_corner(m, n, load):
     term_3 = m**2 * n**2
     term_4 = term_2 / (term_1 + term_3)
     term_5 = (term_1+1) / term_1
-    term_6 = np.arctan(term_2/(term_1-term_3))
-    
-    # term_6 should be a positive angle in radians
-    if term_6 < 0.0:
-        term_6 = term_6 + np.pi
+    # term_6 should be a positive angle in radians,
+    # arctan2 returns it between 0 and pi since term_2 >= 0
+    term_6 = np.arctan2(term_2, term_1-term_3)
     
     # compute I3
     I3 = (1/(4*np.pi))*(term_4 * term_5 + term_6)
@@ -32,6 +36,121 @@ def stress_at_corner(m, n, load):
     # return the vertical stress
     return load*I3
     
+@lru_cache(maxsize=None)
+def I3_table():
+    '''
+    Table of the influence factor I3 of stress_at_corner
+    on a grid of s = m/(1+|m|) and t = n/(1+|n|), every 
+    1/table_size from -1 to 1. This maps all m and n to the
+    table, and I3 is smooth in s and t (it grows linearly 
+    from m = 0 and tends to its limit as 1/m), so it can be 
+    interpolated everywhere. I3 of negative m or n is the
+    signed I3 of the corner superposition: 
+    sign(m) * sign(n) * I3(|m|, |n|).
+    The table is built on first use and kept in memory.
+    It is in single precision, which is enough for the error
+    of the interpolation and halves the memory that is read
+
+    Output:
+    (2*table_size+2) x (2*table_size+2) read-only float32 array 
+    of I3, the last row and column repeat the previous ones, so 
+    interpolation does not need to check the edges
+    '''
+    # m at the table nodes, the nodes at s = -1 and 1 
+    # are m = infinity, which is replaced by a large value
+    s = np.linspace(-1, 1, 2*table_size + 1)
+    m = np.full(s.shape, 1e8)
+    inner = np.abs(s) < 1
+    m[inner] = np.abs(s[inner]) / (1 - np.abs(s[inner]))
+    table = stress_at_corner(m[:, None], m[None, :], 1.0)
+    table *= np.sign(s)[:, None] * np.sign(s)[None, :]
+    table = np.pad(table, ((0, 1), (0, 1)), mode='edge').astype(np.float32)
+    # the table is shared by all the calls
+    table.flags.writeable = False
+    return table
+
+def _table_coordinates(a, z=1.0):
+    '''
+    Row (or column) of the table cells of m = a/z,
+    and position of m inside the cells, between 0 and 1,
+    in single precision as the table
+    '''
+    # s = m/(1+|m|) 
+    s = np.abs(a)
+    s += z
+    np.divide(a, s, out=s)
+    s += 1.0
+    s *= table_size
+    i = s.astype(np.intp)
+    s -= i
+    return i, s.astype(np.float32)
+
+def _table_lookup(row, s, j, t):
+    '''
+    Bilinear interpolation of the I3 table at the cells i, j
+    and positions s, t of _table_coordinates. row is the 
+    position of the row i in the flat table, i * (2*table_size+2),
+    which the sides of the rectangles share
+    '''
+    table = I3_table().ravel()
+    width = 2*table_size + 2
+    k = row + j
+    # values at the corners of the cells
+    f00 = table.take(k)
+    k += 1
+    f01 = table.take(k)
+    k += width
+    f11 = table.take(k)
+    k -= 1
+    f10 = table.take(k)
+    # interpolate along n, then along m
+    f01 -= f00
+    f01 *= t
+    f00 += f01
+    f11 -= f10
+    f11 *= t
+    f10 += f11
+    f10 -= f00
+    f10 *= s
+    f00 += f10
+    return f00
+
+def stress_at_corner_table(m, n, load):
+    '''
+    Compute the vertical stress at the corner of a 
+    rectangular loaded area, as stress_at_corner,
+    by bilinear interpolation of a table of I3 (see I3_table).
+    With the default table_size of 256, the maximum error 
+    of I3 is 5e-6 (I3 is at most 0.25), for all m and n.
+    m and n can be infinite, NaN gives NaN. For single corners
+    this is not faster than stress_at_corner, the table pays off
+    in stress_under_rectangles, where the corners share the sides
+
+    Input:
+    m: rectangle_width/depth_of_point
+    n: rectangle_length/depth_of_point
+    load: load on the rectangle in kN/m^2
+    m, n and load can be scalars or arrays that broadcast
+    
+    Output:
+    vertical stress at the corner in kN/m^2
+    '''
+    m, n = np.broadcast_arrays(np.asarray(m, dtype=float), 
+                               np.asarray(n, dtype=float))
+    # m/(1+|m|) is 1 for large m, and NaN for m = infinity
+    m = np.clip(m, -1e300, 1e300)
+    n = np.clip(n, -1e300, 1e300)
+    valid = ~(np.isnan(m) | np.isnan(n))
+    if not valid.all():
+        # NaN are not in the table
+        I3 = np.full(m.shape, np.nan)
+        I3[valid] = stress_at_corner_table(m[valid], n[valid], 1.0)
+        return load*I3[()]
+    i, s = _table_coordinates(m.ravel())
+    j, t = _table_coordinates(n.ravel())
+    I3 = _table_lookup(i * (2*table_size + 2), s, j, t).astype(float)
+    return load*I3.reshape(m.shape)[()]
+
 def stress_at_center(m, n, load):
     '''
     Compute the vertical stress at the center of a 
@@ -40,6 +159,8 @@ def stress_at_center(m, n, load):
     Input:
     m: rectangle_length/rectangle_width
     n: depth_of_point/(rectangle_width/2)
+    load: load on the rectangle in kN/m^2
+    m, n and load can be scalars or arrays that broadcast
 
     Output:
     vertical stress at the center in kN/m^2
@@ -55,4 +176,117 @@ def stress_at_center(m, n, load):
     I4 = (2/np.pi)*((m*n/term_2)*(term_1/term_3)+np.arcsin(m/term_4))
     
     # return the vertical stress
-    return load*I4  
\ No newline at end of file
+    return load*I4
+
+def _stress_under_rectangles_chunk(x, y, z, rectangles, loads, method='exact'):
+    '''
+    Vertical stress at the points x, y, z (1D arrays) 
+    due to all the rectangles, by superposition of
+    the corner influence factors
+    '''
+    z = z[:, None]
+
+    if method == 'table':
+        # table cells of the four sides, each is used by two corners.
+        # The table has the signs of the corners outside the loaded area
+        i1, s1 = _table_coordinates(rectangles[:, 0] - x[:, None], z)
+        i2, s2 = _table_coordinates(rectangles[:, 2] - x[:, None], z)
+        i1 *= 2*table_size + 2
+        i2 *= 2*table_size + 2
+        cy1 = _table_coordinates(rectangles[:, 1] - y[:, None], z)
+        cy2 = _table_coordinates(rectangles[:, 3] - y[:, None], z)
+        I = _table_lookup(i2, s2, *cy2)
+        I -= _table_lookup(i1, s1, *cy2)
+        I -= _table_lookup(i2, s2, *cy1)
+        I += _table_lookup(i1, s1, *cy1)
+        return I @ loads
+
+    # coordinates of the rectangle sides relative to the points,
+    # points x rectangles arrays
+    x1 = rectangles[:, 0] - x[:, None]
+    y1 = rectangles[:, 1] - y[:, None]
+    x2 = rectangles[:, 2] - x[:, None]
+    y2 = rectangles[:, 3] - y[:, None]
+
+    # rectangle with one corner at the point and the opposite
+    # corner at (a, b), negative if it is outside the loaded area
+    def corner(a, b):
+        I3 = stress_at_corner(np.abs(a)/z, np.abs(b)/z, 1.0)
+        return np.sign(a) * np.sign(b) * I3
+    
+    I = corner(x2, y2) - corner(x1, y2) - corner(x2, y1) + corner(x1, y1)
+
+    return I @ loads
+
+def stress_under_rectangles(x, y, z, rectangles, loads, chunk_size=None,
+                            max_workers=None, cache=None, method='exact'):
+    '''
+    Compute the vertical stress due to a group of 
+    rectangular loaded areas by superposition. 
+    The points are split in chunks, which are computed
+    on a pool of threads.
+
+    Input:
+    x, y: coordinates of the points in m, arrays that broadcast
+    z: depth of the points in m, must be greater than 0
+    rectangles: N x 4 array with the x_min, y_min, x_max, y_max
+        coordinates of the rectangles in m
+    loads: N array with the loads on the rectangles in kN/m^2,
+        or a single load for all the rectangles
+    chunk_size: Number of points in each chunk, by default None
+        which keeps about 250000 point-rectangle pairs per chunk
+    max_workers: Number of threads, by default None 
+        which uses the default of ThreadPoolExecutor
+    cache: ResultCache (see result_cache) to reuse the stresses 
+        of the same points and loads, by default None. 
+        The cached array is read-only
+    method: 'exact' (default) for the equation of stress_at_corner,
+        or 'table' for the interpolation of stress_at_corner_table,
+        with an error of I3 below 5e-6 at each corner. The table 
+        reads less memory than the equation computes, so it is
+        faster, about twice with the default chunk_size
+
+    Output:
+    vertical stress at the points in kN/m^2, 
+    with the broadcast shape of x, y and z
+    '''
+    if cache is not None:
+        # chunk_size and max_workers do not change the result
+        return cache.cached('stress_under_rectangles', 
+                            lambda *args: stress_under_rectangles(
+                                *args[:5], chunk_size, max_workers,
+                                method=args[5]),
+                            x, y, z, rectangles, loads, method)
+
+    # points as 1D arrays
+    x, y, z = np.broadcast_arrays(x, y, z)
+    shape = x.shape
+    x = x.ravel().astype(float)
+    y = y.ravel().astype(float)
+    z = z.ravel().astype(float)
+
+    if method not in ('exact', 'table'):
+        raise ValueError(f"method must be 'exact' or 'table', not {method!r}")
+
+    # rectangles and loads
+    rectangles = np.atleast_2d(np.asarray(rectangles, dtype=float))
+    loads = np.broadcast_to(np.asarray(loads, dtype=float), 
+                            (rectangles.shape[0],))
+
+    # split the points in chunks
+    if chunk_size is None:
+        chunk_size = max(1, 250000 // rectangles.shape[0])
+    starts = range(0, x.size, chunk_size)
+
+    stress = np.zeros(x.size)
+    def compute_chunk(start):
+        chunk = slice(start, start + chunk_size)
+        stress[chunk] = _stress_under_rectangles_chunk(x[chunk], y[chunk], 
+                                                       z[chunk], rectangles, 
+                                                       loads, method)
+    
+    # numpy releases the GIL, so the threads run in parallel
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        list(executor.map(compute_chunk, starts))
+
+    return stress.reshape(shape)
@@ -0,0 +1,164 @@
+import os
+import shutil
+import hashlib
+import tempfile
+import numpy as np
+
+class ResultCache:
+    '''
+    Cache of the results of functions on disk, for example
+    solved flow nets or stress grids. Each result is stored
+    in a folder named by a sha256 hash of the function name and
+    its arguments, with one .npy file per output array.
+    The arrays are loaded back memory-mapped (read-only, without
+    copying them to memory). When the cache is larger than
+    max_bytes, the least recently used results are deleted.
+
+    cache = ResultCache('cache')
+    X, Y, H, Q, q, i_exit, u_wall = solve_flow_net(..., cache=cache)
+
+    The key does not include the code of the function, so
+    clear the cache when the functions change
+    '''
+
+    def __init__(self, directory, max_bytes=2**30):
+        '''
+        Use (and create if needed) the cache folder
+
+        Input:
+        directory: folder of the cache
+        max_bytes: maximum size of the cache in bytes, by default 1 GB
+        '''
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, name, *args):
+        '''
+        Hash of a function name and its arguments.
+        Arrays are hashed by their dtype, shape and data.
+        Numbers are hashed as float64 arrays, so 10, 10.0 and
+        np.float64(10) give the same key
+        '''
+        digest = hashlib.sha256(name.encode())
+        for arg in args:
+            if isinstance(arg, (bool, int, float, np.number, np.bool_)):
+                arg = np.asarray(arg, dtype=float)
+            if isinstance(arg, np.ndarray) or isinstance(arg, (list, tuple)):
+                array = np.ascontiguousarray(arg)
+                digest.update(f'{array.dtype.str}{array.shape}'.encode())
+                digest.update(array.tobytes())
+            else:
+                digest.update(repr(arg).encode())
+            # separate the arguments
+            digest.update(b'|')
+        return digest.hexdigest()
+
+    def get(self, key):
+        '''
+        Load a result, or return None if it is not in the cache
+
+        Output:
+        tuple of memory-mapped arrays, zero dimension
+        arrays are returned as scalars
+        '''
+        folder = os.path.join(self.directory, key)
+        try:
+            files = sorted(file for file in os.listdir(folder)
+                           if file.endswith('.npy'))
+            result = []
+            for file in files:
+                array = np.load(os.path.join(folder, file), mmap_mode='r')
+                result.append(array[()] if array.ndim == 0 else array)
+            # mark the result as recently used
+            os.utime(folder)
+        except FileNotFoundError:
+            # not in the cache, or evicted by another process
+            return None
+        return tuple(result)
+
+    def put(self, key, result, single=False):
+        '''
+        Store a result, a tuple of arrays or scalars,
+        and evict old results if needed. The new result is
+        kept even if it is larger than max_bytes.
+        single marks a result that is one value, not a tuple
+        '''
+        # write in a temporary folder and rename it, so other
+        # processes never see a result that is half written
+        temporary = tempfile.mkdtemp(dir=self.directory, prefix='.tmp')
+        for i, value in enumerate(result):
+            np.save(os.path.join(temporary, f'{i:04d}.npy'), np.asarray(value))
+        if single:
+            open(os.path.join(temporary, 'single'), 'w').close()
+        try:
+            os.rename(temporary, os.path.join(self.directory, key))
+        except OSError:
+            # already stored by another process
+            shutil.rmtree(temporary, ignore_errors=True)
+        self.evict(keep=key)
+
+    def cached(self, name, function, *args):
+        '''
+        Return the result of function(*args) from the cache,
+        or compute and store it. Functions that return a tuple
+        get a tuple back, also of a single value
+        '''
+        key = self.key(name, *args)
+        single_file = os.path.join(self.directory, key, 'single')
+        result = self.get(key)
+        if result is None:
+            computed = function(*args)
+            single = not isinstance(computed, tuple)
+            self.put(key, (computed,) if single else computed, single)
+            # load it memory-mapped, as the results from the cache,
+            # unless another process evicted it already
+            result = self.get(key)
+            if result is None:
+                return computed
+            return result[0] if single else result
+        return result[0] if os.path.exists(single_file) else result
+
+    def size(self):
+        '''
+        Size of the cache in bytes
+        '''
+        return sum(size for folder, size, used in self._entries())
+
+    def _entries(self):
+        '''
+        (folder, size, last use) of the results in the cache
+        '''
+        entries = []
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir() or entry.name.startswith('.'):
+                continue
+            try:
+                size = sum(f.stat().st_size for f in os.scandir(entry.path))
+                entries.append((entry.path, size, entry.stat().st_mtime))
+            except FileNotFoundError:
+                continue
+        return entries
+
+    def evict(self, keep=None):
+        '''
+        Delete the least recently used results until
+        the cache is smaller than max_bytes, except
+        the result of the key keep
+        '''
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        total = sum(size for folder, size, used in entries)
+        for folder, size, used in entries:
+            if total <= self.max_bytes:
+                break
+            if os.path.basename(folder) == keep:
+                continue
+            shutil.rmtree(folder, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        '''
+        Delete all the results
+        '''
+        for folder, size, used in self._entries():
+            shutil.rmtree(folder, ignore_errors=True)
@@ -0,0 +1,230 @@
+import numpy as np
+
+def layer_cells(x_faces, y_faces, bases, values):
+    '''
+    Values of horizontal layers at the cells of a grid,
+    for example the permeabilities kx or kz
+
+    Input:
+    x_faces: array of x coordinates of the cell faces in m
+    y_faces: array of depths of the cell faces in m
+    bases: array of layer bases' depths in m
+    values: array of layer values
+
+    Output:
+    (len(y_faces)-1) x (len(x_faces)-1) array of cell values
+    '''
+    yc = (y_faces[:-1] + y_faces[1:]) / 2.0
+    layer = np.minimum(np.searchsorted(bases, yc), len(bases) - 1)
+    values = np.asarray(values, dtype=float)[layer]
+    return np.repeat(values[:, None], len(x_faces) - 1, axis=1)
+
+def graded_faces(start, end, points, cell_min, cell_max, growth=1.2):
+    '''
+    Cell faces between start and end that are small near
+    a number of points and grow geometrically away from them.
+    The points are faces, so walls and wall tips
+    can be placed at any coordinate
+
+    Input:
+    start, end: coordinates of the first and last faces in m
+    points: array of coordinates of the refinement points in m
+    cell_min: size of the cells next to the points in m
+    cell_max: maximum size of the cells in m
+    growth: maximum ratio of the sizes of neighbour cells
+
+    Output:
+    array of face coordinates
+    '''
+    points = np.asarray(points, dtype=float)
+    breaks = np.unique(np.concatenate(([start, end],
+                       points[(points > start) & (points < end)])))
+    faces = [np.array([start])]
+    for a, b in zip(breaks[:-1], breaks[1:]):
+        # march from the end of the segment at a refinement
+        # point, so the faces are symmetric about the points
+        origin, direction = a, 1.0
+        if np.isin(b, points) and not np.isin(a, points):
+            origin, direction = b, -1.0
+        steps = [0.0]
+        while steps[-1] < b - a:
+            position = origin + direction * steps[-1]
+            distance = np.min(np.abs(points - position)) if points.size else np.inf
+            steps.append(steps[-1] + min(cell_max, cell_min + (growth - 1) * distance))
+        # scale the steps to the length of the segment
+        steps = np.array(steps)
+        if len(steps) > 2 and steps[-1] - (b - a) > (steps[-1] - steps[-2]) / 2:
+            steps = steps[:-1]
+        steps = steps * (b - a) / steps[-1]
+        segment = a + steps if direction > 0 else b - steps[::-1]
+        # exact ends
+        segment[[0, -1]] = a, b
+        faces.append(segment[1:])
+    return np.concatenate(faces)
+
+def _conductances(x_faces, y_faces, kx, kz, walls):
+    '''
+    Conductances between the cells, and between the
+    top cells and the ground surface
+    '''
+    dx = np.diff(x_faces)
+    dy = np.diff(y_faces)
+    # faces between columns, (ny, nx-1), harmonic mean of the cells
+    tx = dy[:, None] / (dx[:-1] / (2 * kx[:, :-1]) + dx[1:] / (2 * kx[:, 1:]))
+    # faces between rows, (ny-1, nx)
+    tz = dx / (dy[:-1, None] / (2 * kz[:-1]) + dy[1:, None] / (2 * kz[1:]))
+    # ground surface, half cell below it
+    ttop = dx / (dy[0] / (2 * kz[0]))
+
+    # walls cut the faces between columns
+    yc = (y_faces[:-1] + y_faces[1:]) / 2.0
+    for x, top, bottom in walls:
+        j = np.argmin(np.abs(x_faces - x))
+        if j == 0 or j == len(x_faces) - 1 or not np.isclose(x_faces[j], x):
+            raise ValueError(f'The wall at x = {x} must be at an inner cell face')
+        tx[(yc > top) & (yc < bottom), j-1] = 0.0
+    return tx, tz, ttop
+
+def _solve_heads(tx, tz, ttop, top_head, right=None, right_head=0.0):
+    '''
+    Assemble and solve the finite volume system of the heads.
+    right is the conductance of the right edge to right_head,
+    which is used to solve half of a symmetric domain
+    '''
+    from scipy import sparse
+    from scipy.sparse.linalg import splu
+
+    ny, nx = tx.shape[0], ttop.size
+    index = np.arange(ny * nx).reshape(ny, nx)
+
+    # diagonal: sum of the conductances of each cell
+    diagonal = np.zeros((ny, nx))
+    diagonal[:, :-1] += tx
+    diagonal[:, 1:] += tx
+    diagonal[:-1] += tz
+    diagonal[1:] += tz
+    # ground surface with known heads
+    rhs = np.zeros((ny, nx))
+    known = np.isfinite(top_head)
+    diagonal[0, known] += ttop[known]
+    rhs[0, known] += ttop[known] * top_head[known]
+    if right is not None:
+        diagonal[:, -1] += right
+        rhs[:, -1] += right * right_head
+
+    # off diagonals: minus the conductance to the neighbours
+    west, east = index[:, :-1].ravel(), index[:, 1:].ravel()
+    north, south = index[:-1].ravel(), index[1:].ravel()
+    rows = np.concatenate((index.ravel(), west, east, north, south))
+    cols = np.concatenate((index.ravel(), east, west, south, north))
+    values = np.concatenate((diagonal.ravel(), -tx.ravel(), -tx.ravel(),
+                             -tz.ravel(), -tz.ravel()))
+    A = sparse.csc_matrix((values, (rows, cols)), shape=(ny * nx, ny * nx))
+    return splu(A).solve(rhs.ravel()).reshape(ny, nx)
+
+def _symmetric_head(tx, tz, ttop, top_head):
+    '''
+    Head at the center if the problem is antisymmetric about
+    the middle face of the grid: symmetric conductances and
+    top heads whose mirrored pairs have a constant mean.
+    None if it is not
+    '''
+    nx = ttop.size
+    if nx % 2 != 0:
+        return None
+    if not (np.allclose(tx, tx[:, ::-1]) and np.allclose(tz, tz[:, ::-1])
+            and np.allclose(ttop, ttop[::-1])):
+        return None
+    known = np.isfinite(top_head)
+    if not np.array_equal(known, known[::-1]) or not known.any():
+        return None
+    mean = (top_head[known] + top_head[::-1][known]) / 2.0
+    if not np.allclose(mean, mean[0]):
+        return None
+    return mean[0]
+
+def seepage(x_faces, y_faces, kx, kz, top_head, walls=(), use_symmetry=True):
+    '''
+    Steady state seepage in a vertical section by cell centred
+    finite volumes, on a grid of rectangular cells that can
+    have different sizes (e.g. smaller near a wall tip).
+    Each cell can have its own horizontal and vertical
+    permeability (layers, anisotropy). The ground surface
+    is at depth y_faces[0], and the sides and the base of the
+    grid are impermeable. Vertical walls (sheet piles, cutoffs)
+    are impermeable lines along cell faces.
+    If the problem is antisymmetric about the middle of the
+    grid (e.g. a single central sheet pile), only the left
+    half is solved, see use_symmetry.
+    The system is solved with a sparse LU decomposition.
+
+    Input:
+    x_faces: array of x coordinates of the cell faces in m
+    y_faces: array of depths of the cell faces in m,
+        increasing downwards
+    kx: horizontal permeability of the cells,
+        (len(y_faces)-1) x (len(x_faces)-1) array or a single value,
+        see layer_cells
+    kz: vertical permeability of the cells, as kx
+    top_head: total head at the ground surface of each column,
+        array with len(x_faces)-1 values, NaN for an impermeable
+        surface (e.g. below a dam)
+    walls: list of (x, top, bottom) tuples, x is a cell face, and
+        the wall cuts the faces with centers between the depths
+        top and bottom
+    use_symmetry: Boolean, True (default) to detect antisymmetric
+        problems and solve half of the grid
+
+    Output:
+    X, Y: x and y (depth) coordinates of the cell centers
+    h: total head at the cell centers
+    psi: stream function at the cell corners, the flow below
+        each corner through the vertical line of the corner,
+        positive to the right. It is 0 along the base
+    q: flow quantity, total inflow through the ground surface
+        per unit length of the section
+    i_exit: maximum vertical gradient of the outflow through
+        the ground surface
+    '''
+    x_faces = np.asarray(x_faces, dtype=float)
+    y_faces = np.asarray(y_faces, dtype=float)
+    shape = (y_faces.size - 1, x_faces.size - 1)
+    kx = np.broadcast_to(np.asarray(kx, dtype=float), shape)
+    kz = np.broadcast_to(np.asarray(kz, dtype=float), shape)
+    top_head = np.asarray(top_head, dtype=float)
+    if not np.isfinite(top_head).any():
+        raise ValueError('At least one column must have a top head')
+
+    tx, tz, ttop = _conductances(x_faces, y_faces, kx, kz, walls)
+
+    # solve half of the grid if the problem is antisymmetric:
+    # the head of a mirrored cell is 2 * h_center - h, so the
+    # middle face ties the cells to h_center with twice its conductance
+    h_center = _symmetric_head(tx, tz, ttop, top_head) if use_symmetry else None
+    if h_center is not None:
+        m = shape[1] // 2
+        half = _solve_heads(tx[:, :m-1], tz[:, :m], ttop[:m], top_head[:m],
+                            2 * tx[:, m-1], h_center)
+        h = np.concatenate((half, 2 * h_center - half[:, ::-1]), axis=1)
+    else:
+        h = _solve_heads(tx, tz, ttop, top_head)
+
+    # stream function: horizontal flows integrated from the base
+    flow_x = np.zeros((shape[0], shape[1] + 1))
+    flow_x[:, 1:-1] = tx * (h[:, :-1] - h[:, 1:])
+    psi = np.zeros((shape[0] + 1, shape[1] + 1))
+    psi[:-1] = np.cumsum(flow_x[::-1], axis=0)[::-1]
+
+    # flows through the ground surface, positive downwards
+    known = np.isfinite(top_head)
+    flow_top = np.where(known, ttop * (np.where(known, top_head, 0.0) - h[0]), 0.0)
+    q = np.sum(flow_top[flow_top > 0])
+    # exit gradient of the columns with outflow
+    gradient = -flow_top / (kz[0] * np.diff(x_faces))
+    i_exit = max(np.max(gradient), 0.0)
+
+    xc = (x_faces[:-1] + x_faces[1:]) / 2.0
+    yc = (y_faces[:-1] + y_faces[1:]) / 2.0
+    X, Y = np.meshgrid(xc, yc)
+
+    return X, Y, h, psi, q, i_exit
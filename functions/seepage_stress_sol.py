@@ -0,0 +1,97 @@
+import numpy as np
+from stress_profile_sol import stress_profiles
+
+def seepage_stresses(X, Y, H, H2, bases, gammas, k0, gamma_w=9.81):
+    """
+    Calculate the stresses in a soil mass with seepage,
+    from the head field of flow_net_sol.solve_flow_net and
+    a number of horizontal layers of saturated soil.
+    The layers are defined as in stress_profile, and
+    the ground surface is at depth 0, under water.
+
+    Input:
+    X, Y: x and y (depth) coordinates of the grid in m
+    H: head above the downstream water level at the grid nodes
+    H2: height of water above the ground surface downstream in m
+    bases: array of layer bases' depths in meters
+    gammas: array of layer saturated unit weights in kN/m3
+    k0: array of layer effective coefficients of earth pressure at rest
+    gamma_w: unit weight of water, kN/m3
+
+    Output:
+    u: pore water pressure (kPa)
+    sz_total: total vertical stress (kPa), including the
+        weight of the water above the ground surface
+    sz_eff: effective vertical stress (kPa)
+    sx_eff: effective horizontal stress (kPa)
+    sx_total: total horizontal stress (kPa)
+    delta_u: change in pore water pressure due to the seepage
+        (kPa), relative to hydrostatic pressure below the water
+        level of each column. The effective vertical stress
+        changes by -delta_u: it increases where the water flows
+        down (upstream) and decreases where it flows up (downstream)
+    """
+    Y = np.asarray(Y, dtype=float)
+    H = np.asarray(H, dtype=float)
+    # pore water pressure: total head above the ground surface
+    # (H2 + H) minus the elevation (-Y)
+    u = gamma_w * (H2 + H + Y)
+    # the head at the surface gives the water level of each column
+    water = gamma_w * (H2 + H[0])
+    # weight of the soil, linear within each layer
+    depths, sz_soil, _, _, _, _ = stress_profiles(bases, gammas,
+                                                  np.zeros(len(bases)), 0.0, gamma_w)
+    sz_total = water + np.interp(Y, depths, sz_soil)
+    sz_eff = sz_total - u
+    # k0 of the layer at each depth
+    layer = np.minimum(np.searchsorted(bases, Y), len(bases) - 1)
+    sx_eff = np.asarray(k0, dtype=float)[layer] * sz_eff
+    sx_total = sx_eff + u
+    # hydrostatic pressure below the water level of each column
+    delta_u = gamma_w * (H - H[0])
+    return u, sz_total, sz_eff, sx_eff, sx_total, delta_u
+
+def heave_check(X, Y, H, H3, bases, gammas, gamma_w=9.81, x_wall=None):
+    """
+    Check the soil downstream of a sheet pile wall against
+    heave, with the prism of Terzaghi: width H3/2 next to the
+    wall and depth H3, and against piping at the exit face.
+
+    Input:
+    X, Y: x and y (depth) coordinates of the grid in m
+    H: head above the downstream water level at the grid nodes
+    H3: depth of wall penetration in m
+    bases: array of layer bases' depths in meters
+    gammas: array of layer saturated unit weights in kN/m3
+    gamma_w: unit weight of water, kN/m3
+    x_wall: x coordinate of the wall in m, by default None
+        which is the middle of the grid, as in solve_flow_net
+
+    Output:
+    fs_heave: factor of safety against heave, the effective
+        weight of the prism over the uplift of the excess
+        pore water pressure at its base
+    fs_piping: factor of safety against piping, the critical
+        gradient of the first layer over the exit gradient
+    i_exit: maximum exit gradient at the downstream surface
+    """
+    x = X[0]
+    y = Y[:, 0]
+    if x_wall is None:
+        x_wall = (x[0] + x[-1]) / 2.0
+    # columns of the prism, and head at its base
+    prism = (x > x_wall) & (x <= x_wall + H3 / 2.0)
+    excess = np.array([np.interp(H3, y, H[:, j]) for j in np.where(prism)[0]])
+    # effective weight of the prism: buoyant weight of the layers
+    depths, sz_soil, _, _, _, _ = stress_profiles(bases, gammas,
+                                                  np.zeros(len(bases)), 0.0, gamma_w)
+    weight = np.interp(H3, depths, sz_soil) - gamma_w * H3
+    fs_heave = weight / (gamma_w * np.mean(excess))
+
+    # exit gradient downstream, and critical gradient
+    downstream = x > x_wall
+    i_exit = np.max(H[1, downstream] - H[0, downstream]) / (y[1] - y[0])
+    i_critical = (gammas[0] - gamma_w) / gamma_w
+    fs_piping = i_critical / i_exit
+
+    return fs_heave, fs_piping, i_exit
@@ -12,6 +12,11 @@ def vert_stress(bases, gammas, gw, gamma_w=9.81):
     gammas: array of layer unit weights in kN/m3
     gw: groundwater level in meters
     gamma_w: unit weight of water, kN/m3
+
+    bases and gammas can also be 2D arrays with one profile 
+    (e.g. borehole) per row, and gw an array with one level per 
+    profile. Profiles with fewer layers are padded at the end 
+    with NaN, which gives NaN stresses
     
     Output:
     sz_total: array of total vertical stress 
@@ -24,30 +29,29 @@ def vert_stress(bases, gammas, gw, gamma_w=9.81):
     """
     
     # Check if the input arrays have the same length
-    if len(bases) != len(gammas):
+    bases = np.asarray(bases, dtype=float)
+    gammas = np.asarray(gammas, dtype=float)
+    if bases.shape != gammas.shape:
         print("Error: The input arrays must have the same length")
         return
 
-    # Number of layers
-    n = len(bases)
-    
-    # Initialize arrays
-    sz_total = np.zeros(n+1) # total vertical stress
-    u = np.zeros(n+1) # pore water pressure
-    sz_eff = np.zeros(n+1) # effective vertical stress
-    
+    # depths of the layer tops and bases,
     # insert 0 at start of bases since the ground surface is at depth 0
-    bases = np.insert(bases, 0, 0)
+    depths = np.insert(bases, 0, 0, axis=-1)
+    # groundwater level of each profile
+    gw = np.asarray(gw, dtype=float)[..., None]
     
     # Calculate stresses
-    for i in range(n):
-        # total vertical stress at the base of the layer
-        sz_total[i+1] = sz_total[i] + gammas[i]*(bases[i+1] - bases[i])
-        # pore water pressure at the base of the layer
-        if bases[i+1] > gw:
-            u[i+1] = gamma_w*(bases[i+1] - gw)
-        # effective vertical stress at the base of the layer      
-        sz_eff[i+1] = sz_total[i+1] - u[i+1]
+    # total vertical stress: cumulative weight of the layers
+    sz_total = np.zeros(depths.shape)
+    sz_total[..., 1:] = np.cumsum(gammas * np.diff(depths, axis=-1), axis=-1)
+    # pore water pressure at the base of the layers
+    u = np.zeros(depths.shape)
+    u[..., 1:] = np.where(bases > gw, gamma_w*(bases - gw), 0.0)
+    # NaN padding of ragged profiles stays NaN
+    u[..., 1:][np.isnan(bases)] = np.nan
+    # effective vertical stress
+    sz_eff = sz_total - u
 
     return sz_total, u, sz_eff
 
@@ -60,13 +64,24 @@ def vert_strain(sigma_0, delta_sigma, modulus, model=1):
     sigma_0: initial effective vertical stress (kPa)
     delta_sigma: change in effective vertical stress (kPa)
     modulus: soil modulus number
+    model: 1 elastic (rock, morraine, OC-clay), 
+           2 elasto-plastic (sand, coarse silt), or
+           3 plastic (NC-clay, fine silt)
+    All inputs can be scalars or arrays that broadcast,
+    for example one value per node of a profile
     
     Output:
     epsilon: vertical strain
+
+    Notice that the strain of model 3 is unbounded where 
+    sigma_0 = 0 (e.g. at the ground surface). At these 
+    nodes the strain is set to 0
     """
+    sigma_0, delta_sigma, modulus, model = np.broadcast_arrays(
+        sigma_0, delta_sigma, modulus, model)
 
     # make sure model is either 1, 2, or 3
-    if model not in [1, 2, 3]:
+    if not np.all(np.isin(model, [1, 2, 3])):
         print("Error: model must be either 1, 2, or 3")
         return
     
@@ -74,14 +89,18 @@ def vert_strain(sigma_0, delta_sigma, modulus, model=1):
     sigma_ref = 100 # kPa
 
     # calculate vertical strain
-    if model == 1:
-        # elastic model, rock, morraine, OC-clay
-        epsilon = delta_sigma / (modulus*sigma_ref)
-    elif model == 2:
-        # elasto-plastic model, sand, coarse silt
-        epsilon = (2.0/modulus)*(np.sqrt((sigma_0 + delta_sigma)/sigma_ref) - np.sqrt(sigma_0/sigma_ref))
-    elif model == 3:
-        # plastic model, NC-clay, fine silt
-        epsilon = (1.0/modulus)*np.log((sigma_0 + delta_sigma)/sigma_0)
+    epsilon = np.zeros(model.shape)
+    # elastic model, rock, morraine, OC-clay
+    m = model == 1
+    epsilon[m] = delta_sigma[m] / (modulus[m]*sigma_ref)
+    # elasto-plastic model, sand, coarse silt
+    m = model == 2
+    epsilon[m] = (2.0/modulus[m])*(np.sqrt((sigma_0[m] + delta_sigma[m])/sigma_ref)
+                                   - np.sqrt(sigma_0[m]/sigma_ref))
+    # plastic model, NC-clay, fine silt
+    # nodes with sigma_0 = 0 keep a strain of 0
+    m = (model == 3) & (sigma_0 > 0)
+    epsilon[m] = (1.0/modulus[m])*np.log((sigma_0[m] + delta_sigma[m])/sigma_0[m])
     
-    return epsilon
\ No newline at end of file
+    # return a scalar if the inputs are scalars
+    return epsilon[()]
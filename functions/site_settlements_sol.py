@@ -0,0 +1,136 @@
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from rect_load_sol import stress_under_rectangles
+from settlements_sol import vert_stress, vert_strain
+import profiling
+
+def profile_nodes(bases, gammas, modulus, model, gw, gamma_w=9.81, interval=0.1):
+    """
+    Discretize a soil mass consisting of a number of
+    horizontal layers into nodes, and calculate the initial
+    effective vertical stress at the nodes.
+    The nodes at the layer interfaces are repeated, once
+    for the layer above and once for the layer below,
+    so the strain can jump at the interfaces.
+
+    Input:
+    bases: array of layer bases' depths in meters
+    gammas: array of layer unit weights in kN/m3
+    modulus: array of layer modulus numbers
+    model: array of layer models, see vert_strain
+    gw: groundwater level in meters
+    gamma_w: unit weight of water, kN/m3
+    interval: maximum distance between nodes in meters
+
+    Output:
+    depths: array of node depths
+    sigma_0: array of initial effective vertical stress (kPa)
+    node_modulus: array of modulus numbers at the nodes
+    node_model: array of models at the nodes
+    """
+    bases = np.asarray(bases, dtype=float)
+    tops = np.insert(bases[:-1], 0, 0.0)
+
+    # nodes in each layer, including its top and base
+    depths = []
+    layers = []
+    for i in range(len(bases)):
+        n = int(np.ceil((bases[i] - tops[i]) / interval))
+        depths.append(np.linspace(tops[i], bases[i], n+1))
+        layers.append(np.full(n+1, i))
+    depths = np.concatenate(depths)
+    layers = np.concatenate(layers)
+
+    # stresses at the unique depths
+    unique_depths, inverse = np.unique(depths, return_inverse=True)
+    # unit weight of the interval above each unique depth
+    above = np.searchsorted(bases, unique_depths[1:], side='left')
+    sz_total, u, sz_eff = vert_stress(unique_depths[1:],
+                                      np.asarray(gammas)[above], gw, gamma_w)
+    sigma_0 = sz_eff[inverse]
+
+    return depths, sigma_0, np.asarray(modulus)[layers], np.asarray(model)[layers]
+
+def _foundation_settlement(args):
+    """
+    Settlement below the center of one foundation,
+    in a worker process
+    """
+    xc, yc, rectangles, loads, depth_f, depths, sigma_0, modulus, model = args
+    # nodes below the foundation base
+    below = depths >= depth_f
+    z = depths[below]
+    # vertical stress from all the foundations, the minimum
+    # depth avoids the singularity at the foundation base
+    delta_sigma = stress_under_rectangles(xc, yc, np.maximum(z - depth_f, 1e-6),
+                                          rectangles, loads, max_workers=1)
+    # vertical strain and settlement
+    epsilon = vert_strain(sigma_0[below], delta_sigma, modulus[below],
+                          model[below])
+    return np.trapezoid(epsilon, z)
+
+def site_settlements(rectangles, loads, bases, gammas, modulus, model, gw,
+                     gamma_w=9.81, depth_f=0.0, interval=0.1, max_workers=None):
+    """
+    Calculate the settlements of a group of rectangular
+    foundations on a soil mass consisting of a number of
+    horizontal layers. The vertical stress below the center
+    of each foundation includes the stresses from all the
+    other foundations. The strain is integrated from the
+    foundation base to the base of the last layer.
+    The foundations are computed on a pool of processes.
+
+    Input:
+    rectangles: N x 4 array with the x_min, y_min, x_max, y_max
+        coordinates of the foundations in m
+    loads: N array with the net loads on the foundations
+        in kN/m^2, or a single load for all the foundations
+    bases: array of layer bases' depths in meters
+    gammas: array of layer unit weights in kN/m3
+    modulus: array of layer modulus numbers
+    model: array of layer models, see vert_strain
+    gw: groundwater level in meters
+    gamma_w: unit weight of water, kN/m3
+    depth_f: depth of the foundation base in meters
+    interval: maximum distance between nodes in meters
+    max_workers: Number of processes, by default None
+        which uses all the cores. 1 runs without a pool
+
+    Output:
+    settlement: N array of settlements in m
+    differential: N x N array of differential settlements
+        (settlement of row foundation - column foundation) in m
+    distortion: N x N array of angular distortions, the
+        differential settlements divided by the distances
+        between the foundation centers
+    """
+    rectangles = np.atleast_2d(np.asarray(rectangles, dtype=float))
+    loads = np.broadcast_to(np.asarray(loads, dtype=float),
+                            (rectangles.shape[0],))
+    # foundation centers
+    xc = (rectangles[:, 0] + rectangles[:, 2]) / 2.0
+    yc = (rectangles[:, 1] + rectangles[:, 3]) / 2.0
+
+    # initial stresses and soil parameters at the nodes
+    with profiling.phase('profile nodes'):
+        depths, sigma_0, node_modulus, node_model = profile_nodes(
+            bases, gammas, modulus, model, gw, gamma_w, interval)
+
+    # one task per foundation
+    tasks = [(xc[i], yc[i], rectangles, loads, depth_f, depths, sigma_0,
+              node_modulus, node_model) for i in range(rectangles.shape[0])]
+    with profiling.phase('foundation settlements'):
+        if max_workers == 1:
+            settlement = np.array([_foundation_settlement(t) for t in tasks])
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                settlement = np.array(list(executor.map(_foundation_settlement,
+                                                        tasks)))
+
+    # differential settlements and angular distortions
+    differential = settlement[:, None] - settlement[None, :]
+    distance = np.hypot(xc[:, None] - xc[None, :], yc[:, None] - yc[None, :])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        distortion = np.where(distance > 0, differential / distance, 0.0)
+
+    return settlement, differential, distortion
@@ -1,7 +1,72 @@
 import numpy as np
 import matplotlib.pyplot as plt
 
-def stress_profile(bases, gammas, k0, gw, gamma_w=9.81, q=0):
+def stress_profiles(bases, gammas, k0, gw, gamma_w=9.81, q=0):
+    """
+    Calculate profiles of vertical and horizontal stresses
+    in soil masses consisting of a number of horizontal layers.
+    The ground surface is at depth 0, and the layers are
+    defined by their bases' depths, gammas and k0 arrays.
+    bases, gammas and k0 can be 1D arrays (one profile), or
+    2D arrays with one profile (e.g. borehole) per row. 
+    Profiles with fewer layers are padded at the end with NaN,
+    which gives NaN stresses.
+
+    Input:
+    bases: array of layer bases' depths in meters
+    gammas: array of layer unit weights in kN/m3
+    k0: effective coefficient of earth pressure at rest,
+        input an array of zeros if no horizontal stress is required
+    gw: groundwater level in meters, or an array 
+        with one level per profile
+    gamma_w: unit weight of water, kN/m3
+    q: surcharge load in kN/m2, or an array 
+        with one load per profile
+
+    Output:
+    depths: array of depths, the ground surface and the layer bases
+    sz_total: array of total vertical stress
+    u: array of pore water pressure
+    sz_eff: array of effective vertical stress
+    sx_eff: array of effective horizontal stress
+    sx_total: array of total horizontal stress
+    """
+    bases = np.asarray(bases, dtype=float)
+    gammas = np.asarray(gammas, dtype=float)
+    k0 = np.asarray(k0, dtype=float)
+    # groundwater level and surcharge of each profile
+    gw = np.asarray(gw, dtype=float)[..., None]
+    q = np.asarray(q, dtype=float)[..., None]
+
+    # insert 0 at start of bases since the ground surface is at depth 0
+    depths = np.insert(bases, 0, 0, axis=-1)
+    
+    # total vertical stress: surcharge plus cumulative weight of the layers
+    sz_total = np.zeros(depths.shape) + q
+    sz_total[..., 1:] += np.cumsum(gammas * np.diff(depths, axis=-1), axis=-1)
+    # pore water pressure at the base of the layers
+    u = np.zeros(depths.shape)
+    u[..., 1:] = np.where(bases > gw, gamma_w*(bases - gw), 0.0)
+    # NaN padding of ragged profiles stays NaN
+    u[..., 1:][np.isnan(bases)] = np.nan
+    # effective vertical stress
+    sz_eff = sz_total - u
+    
+    # horizontal stresses, only where k0 > 0
+    # at the surface use k0 of the first layer, 
+    # and at the base of each layer use k0 of the layer
+    k0 = np.where(k0 > 0, k0, 0.0)
+    k0_nodes = np.concatenate((k0[..., :1], k0), axis=-1)
+    sx_eff = k0_nodes * sz_eff
+    sx_total = sx_eff + np.where(k0_nodes > 0, u, 0.0)
+
+    return depths, sz_total, u, sz_eff, sx_eff, sx_total
+
+# fields of the structured array returned by stress_profile
+profile_fields = ['depth', 'sz_total', 'u', 'sz_eff', 'sx_eff', 'sx_total']
+
+def stress_profile(bases, gammas, k0, gw, gamma_w=9.81, q=0, 
+                   print_table=False, plot=False):
     """
     Calculate profile of vertical and horizontal stresses
     in a soil mass consisting of a number of horizontal layers.
@@ -15,6 +80,13 @@ def stress_profile(bases, gammas, k0, gw, gamma_w=9.81, q=0):
     gw: groundwater level in meters
     gamma_w: unit weight of water, kN/m3
     q: surcharge load in kN/m2
+    print_table: Boolean to print the results, by default False
+    plot: Boolean to plot the results, by default False
+
+    Output:
+    profile: structured array with one row per depth 
+        (the ground surface and the layer bases) and the fields
+        depth, sz_total, u, sz_eff, sx_eff and sx_total in kPa
     """
     
     # Check if the input arrays have the same length
@@ -22,63 +94,63 @@ def stress_profile(bases, gammas, k0, gw, gamma_w=9.81, q=0):
         print("Error: The input arrays must have the same length")
         return
 
-    # Number of layers
-    n = len(bases)
-    
-    # Initialize arrays
-    sz_total = np.zeros(n+1) # total vertical stress
-    u = np.zeros(n+1) # pore water pressure
-    sz_eff = np.zeros(n+1) # effective vertical stress
-    sx_eff = np.zeros(n+1) # effective horizontal stress
-    sx_total = np.zeros(n+1) # total horizontal stress
-    # Add surcharge to the top layer
-    sz_total[0] = q
-    sz_eff[0] = q
-    if k0[0] > 0:
-        sx_eff[0] = k0[0] * q
-        sx_total[0] = k0[0] * q
-    
-    # insert 0 at start of bases since the ground surface is at depth 0
-    bases = np.insert(bases, 0, 0)
-    
     # Calculate stresses
-    for i in range(n):
-        # total vertical stress at the base of the layer
-        sz_total[i+1] = sz_total[i] + gammas[i]*(bases[i+1] - bases[i])
-        # pore water pressure at the base of the layer
-        if bases[i+1] > gw:
-            u[i+1] = gamma_w*(bases[i+1] - gw)
-        # effective vertical stress at the base of the layer      
-        sz_eff[i+1] = sz_total[i+1] - u[i+1]
-        # if horizontal stress is required
-        if k0[i] > 0:
-            # effective horizontal stress at the base of the layer
-            sx_eff[i+1] = k0[i] * sz_eff[i+1]
-            # total horizontal stress at the base of the layer
-            sx_total[i+1] = sx_eff[i+1] + u[i+1]
+    stresses = stress_profiles(bases, gammas, k0, gw, gamma_w, q)
+    profile = np.zeros(len(bases)+1, 
+                       dtype=[(field, float) for field in profile_fields])
+    for field, values in zip(profile_fields, stresses):
+        profile[field] = values
+
+    # horizontal stresses are reported if k0 of the first layer > 0
+    if print_table:
+        print_profile(profile, horizontal=k0[0] > 0)
+    if plot:
+        plot_profile(profile, horizontal=k0[0] > 0)
+
+    return profile
+
+def print_profile(profile, horizontal=True):
+    """
+    Print a stress profile as a table
 
+    Input:
+    profile: structured array returned by stress_profile
+    horizontal: Boolean to print the horizontal stresses,
+        by default True
+    """
     # print results, with 2 decimal places
-    if k0[0] > 0:
+    if horizontal:
         print("Depth (m)  σ_z (kPa)  u (kPa)  σ_z' (kPa)  σ_x' (kPa)  σ_x (kPa)")
         print('------------------------------------------------------------------')
     else:
         print("Depth (m)  σ_z (kPa)  u (kPa)  σ_z' (kPa)")
         print('------------------------------------------')
-    for i in range(n+1):
-        if k0[0] > 0:
-            print(f'{bases[i]:6.2f} {sz_total[i]:10.2f} {u[i]:10.2f} '
-                  f'{sz_eff[i]:10.2f} {sx_eff[i]:10.2f} {sx_total[i]:10.2f}')
+    for row in profile:
+        if horizontal:
+            print(f'{row["depth"]:6.2f} {row["sz_total"]:10.2f} {row["u"]:10.2f} '
+                  f'{row["sz_eff"]:10.2f} {row["sx_eff"]:10.2f} {row["sx_total"]:10.2f}')
         else:
-            print(f'{bases[i]:6.2f} {sz_total[i]:10.2f} {u[i]:10.2f} {sz_eff[i]:10.2f}')
+            print(f'{row["depth"]:6.2f} {row["sz_total"]:10.2f} {row["u"]:10.2f} '
+                  f'{row["sz_eff"]:10.2f}')
+
+def plot_profile(profile, horizontal=True):
+    """
+    Plot the curves of a stress profile side by side
 
+    Input:
+    profile: structured array returned by stress_profile
+    horizontal: Boolean to plot the horizontal stresses,
+        by default True
+    """
+    depths = profile['depth']
     # curves to plot
     n_curves = 3
-    curves = [sz_total, u, sz_eff]
+    curves = [profile['sz_total'], profile['u'], profile['sz_eff']]
     titles = ['Total vertical stress (kPa)', 'Pore water pressure (kPa)', 
               'Effective vertical stress (kPa)']
-    if k0[0] > 0:
+    if horizontal:
         n_curves = 5
-        curves.extend([sx_eff, sx_total])
+        curves.extend([profile['sx_eff'], profile['sx_total']])
         titles.extend(['Effective horizontal stress (kPa)', 
                        'Total horizontal stress (kPa)'])
     
@@ -88,7 +160,7 @@ def stress_profile(bases, gammas, k0, gw, gamma_w=9.81, q=0):
     rounded_num = np.ceil(max(curves[0]) / 10) * 10
         
     for i in range(n_curves):
-        ax[i].plot(curves[i], bases, 'b-', marker='o', 
+        ax[i].plot(curves[i], depths, 'b-', marker='o', 
                    markerfacecolor='red', markeredgecolor='red')
         ax[i].grid(True)
         ax[i].set_xlabel(titles[i])
@@ -97,9 +169,111 @@ def stress_profile(bases, gammas, k0, gw, gamma_w=9.81, q=0):
         ax[i].set_xlim([0, rounded_num])
         if i == 0:
             ax[i].set_ylabel('Depth (m)')
-        ax[i].set_ylim([bases[-1]+1, bases[0]])
+        ax[i].set_ylim([depths[-1]+1, depths[0]])
         
     # avoid overlap of the subplots
     fig.tight_layout()
 
-    plt.show()
\ No newline at end of file
+    plt.show()
+
+def _profiles_table(profiles, ids=None):
+    """
+    Stack profiles in one structured array with 
+    a profile id field
+    """
+    if ids is None:
+        ids = range(len(profiles))
+    dtype = [('profile', int)] + [(field, float) for field in profile_fields]
+    table = np.zeros(sum(len(p) for p in profiles), dtype=dtype)
+    start = 0
+    for profile_id, profile in zip(ids, profiles):
+        rows = slice(start, start + len(profile))
+        table['profile'][rows] = profile_id
+        for field in profile_fields:
+            table[field][rows] = profile[field]
+        start += len(profile)
+    return table
+
+def save_profiles(filename, profiles, ids=None):
+    """
+    Write a list of stress profiles to one file.
+    The format is given by the file extension:
+    .csv, .npz or .parquet (requires pyarrow).
+    The rows of all profiles are stacked, with a 
+    profile column that identifies them
+
+    Input:
+    filename: name of the file
+    profiles: list of structured arrays returned by stress_profile
+    ids: list of integer profile ids, by default None 
+        which numbers the profiles from 0
+    """
+    table = _profiles_table(profiles, ids)
+    if filename.endswith('.npz'):
+        np.savez(filename, **{name: table[name] for name in table.dtype.names})
+    else:
+        with ProfileWriter(filename) as writer:
+            writer.write_table(table)
+
+class ProfileWriter:
+    """
+    Write stress profiles to a .csv or .parquet file
+    one at a time, so the profiles do not have to be
+    held in memory. Use it as a context manager:
+
+    with ProfileWriter('profiles.csv') as writer:
+        for i in range(n):
+            writer.write(stress_profile(...), i)
+    """
+
+    def __init__(self, filename):
+        """
+        Open the file and write the header
+        """
+        self.filename = filename
+        self.columns = ['profile'] + profile_fields
+        if filename.endswith('.csv'):
+            self.parquet = None
+            self.file = open(filename, 'w')
+            self.file.write(','.join(self.columns) + '\n')
+        elif filename.endswith('.parquet'):
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            self.file = None
+            schema = pa.schema([('profile', pa.int64())] + 
+                               [(field, pa.float64()) for field in profile_fields])
+            self.parquet = pq.ParquetWriter(filename, schema)
+        else:
+            raise ValueError("The file extension must be .csv or .parquet")
+
+    def write(self, profile, profile_id):
+        """
+        Write one profile returned by stress_profile
+        """
+        self.write_table(_profiles_table([profile], [profile_id]))
+
+    def write_table(self, table):
+        """
+        Write a table of stacked profiles, with a profile field
+        """
+        if self.parquet is None:
+            np.savetxt(self.file, np.column_stack([table[c] for c in self.columns]),
+                       fmt=['%d'] + ['%.10g'] * len(profile_fields), delimiter=',')
+        else:
+            import pyarrow as pa
+            self.parquet.write_table(pa.table({c: table[c] for c in self.columns}))
+
+    def close(self):
+        """
+        Close the file
+        """
+        if self.parquet is None:
+            self.file.close()
+        else:
+            self.parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
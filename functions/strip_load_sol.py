@@ -0,0 +1,204 @@
+import numpy as np
+
+def linear_strip_load(x, z, x1, x2, q1, q2):
+    '''
+    Compute the stresses below a strip load that varies
+    linearly from q1 at x1 to q2 at x2, by integration of
+    the Boussinesq (Flamant) line load solution.
+    Uniform (q1 = q2) and triangular (q1 = 0) loads
+    are particular cases.
+
+    Input:
+    x: horizontal coordinate of the points in m
+    z: depth of the points in m
+    x1, x2: horizontal coordinates of the strip edges in m,
+        x1 must be less than x2
+    q1, q2: loads at x1 and x2 in kN/m^2
+    All inputs can be scalars or arrays that broadcast
+
+    Output:
+    dsz: increase in vertical stress in kN/m^2
+    dsx: increase in horizontal stress in kN/m^2
+    txz: increase in shear stress in kN/m^2
+    '''
+    # slope of the load and load extrapolated to x
+    b = (q2 - q1) / (x2 - x1)
+    c = q1 + b * (x - x1)
+
+    # horizontal distances and distances to the strip edges
+    u1 = x - x1
+    u2 = x - x2
+    R1_sq = u1**2 + z**2
+    R2_sq = u2**2 + z**2
+    # at the edges on the surface R is 0, and the terms
+    # with R are 0 since u and z are 0 (the stress is
+    # half the load). Use R = 1 there to avoid 0/0
+    R1_sq = np.where(R1_sq > 0, R1_sq, 1.0)
+    R2_sq = np.where(R2_sq > 0, R2_sq, 1.0)
+
+    # angles from the vertical to the strip edges,
+    # theta1 >= theta2
+    theta = np.arctan2(u1, z) - np.arctan2(u2, z)
+    # sin(theta)cos(theta) and sin(theta)^2 at the edges
+    sc = u1 * z / R1_sq - u2 * z / R2_sq
+    ss = u1**2 / R1_sq - u2**2 / R2_sq
+
+    # integrals of the line load solution over the strip
+    dsz = (2/np.pi) * (c * (theta + sc) / 2.0 - b * z * ss / 2.0)
+    dsx = (2/np.pi) * (c * (theta - sc) / 2.0 -
+                       b * z * (0.5 * np.log(R1_sq / R2_sq) - ss / 2.0))
+    txz = (2/np.pi) * (c * ss / 2.0 - b * z * (theta - sc) / 2.0)
+
+    return dsz, dsx, txz
+
+def strip_load(x, z, B, q, x0=0.0, cache=None):
+    '''
+    Compute the stresses below a uniform strip load.
+    Eq. 10.24 to 10.26 of Das (2022)
+
+    Input:
+    x: horizontal coordinate of the points in m
+    z: depth of the points in m
+    B: width of the strip in m
+    q: load on the strip in kN/m^2
+    x0: horizontal coordinate of the left edge of the strip
+        in m, by default 0
+    All inputs can be scalars or arrays that broadcast
+    cache: ResultCache (see result_cache) to reuse the stresses
+        of the same inputs, by default None. The cached
+        arrays are read-only
+
+    Output:
+    dsz: increase in vertical stress in kN/m^2
+    dsx: increase in horizontal stress in kN/m^2
+    txz: increase in shear stress in kN/m^2
+    '''
+    if cache is not None:
+        return cache.cached('strip_load', strip_load, x, z, B, q, x0)
+    return linear_strip_load(x, z, x0, x0 + B, q, q)
+
+def strip_loads(x, z, x_left, B, q, cache=None):
+    '''
+    Compute the stresses below a number of
+    uniform strip loads, by superposition.
+
+    Input:
+    x: horizontal coordinate of the points in m
+    z: depth of the points in m
+    x_left: array with the left edges of the strips in m
+    B: array with the widths of the strips in m
+    q: array with the loads on the strips in kN/m^2
+    cache: ResultCache (see result_cache) to reuse the stresses
+        of the same inputs, by default None. The cached
+        arrays are read-only
+
+    Output:
+    dsz: increase in vertical stress in kN/m^2
+    dsx: increase in horizontal stress in kN/m^2
+    txz: increase in shear stress in kN/m^2
+    '''
+    if cache is not None:
+        return cache.cached('strip_loads', strip_loads, x, z, x_left, B, q)
+
+    x_left, B, q = np.broadcast_arrays(x_left, B, q)
+
+    dsz = 0.0
+    dsx = 0.0
+    txz = 0.0
+    for i in range(x_left.size):
+        stresses = strip_load(x, z, B.flat[i], q.flat[i], x_left.flat[i])
+        dsz = dsz + stresses[0]
+        dsx = dsx + stresses[1]
+        txz = txz + stresses[2]
+
+    return dsz, dsx, txz
+
+def piecewise_load(x, z, x_nodes, q_nodes, cache=None):
+    '''
+    Compute the stresses below a strip load that is
+    piecewise linear, for example a trapezoidal load.
+    The load is defined by the x coordinates and the load
+    values at its nodes, and it is zero outside them.
+
+    Input:
+    x: horizontal coordinate of the points in m
+    z: depth of the points in m
+    x_nodes: array with the x coordinates of the nodes in m,
+        in increasing order
+    q_nodes: array with the loads at the nodes in kN/m^2
+    cache: ResultCache (see result_cache) to reuse the stresses
+        of the same inputs, by default None. The cached
+        arrays are read-only
+
+    Output:
+    dsz: increase in vertical stress in kN/m^2
+    dsx: increase in horizontal stress in kN/m^2
+    txz: increase in shear stress in kN/m^2
+    '''
+    if cache is not None:
+        return cache.cached('piecewise_load', piecewise_load, 
+                            x, z, x_nodes, q_nodes)
+
+    dsz = 0.0
+    dsx = 0.0
+    txz = 0.0
+    for i in range(len(x_nodes) - 1):
+        # skip segments without width or without load
+        if x_nodes[i+1] <= x_nodes[i]:
+            continue
+        if q_nodes[i] == 0 and q_nodes[i+1] == 0:
+            continue
+        stresses = linear_strip_load(x, z, x_nodes[i], x_nodes[i+1],
+                                     q_nodes[i], q_nodes[i+1])
+        dsz = dsz + stresses[0]
+        dsx = dsx + stresses[1]
+        txz = txz + stresses[2]
+
+    return dsz, dsx, txz
+
+def embankment_load(x, z, a, b, q, x0=0.0, cache=None):
+    '''
+    Compute the stresses below a symmetric embankment,
+    a trapezoidal load with a crest and two slopes.
+
+    Input:
+    x: horizontal coordinate of the points in m
+    z: depth of the points in m
+    a: width of the crest in m
+    b: horizontal width of each slope in m
+    q: load at the crest (unit weight * height) in kN/m^2
+    x0: horizontal coordinate of the toe of the left slope
+        in m, by default 0
+    cache: ResultCache to reuse the stresses, by default None,
+        see piecewise_load
+
+    Output:
+    dsz: increase in vertical stress in kN/m^2
+    dsx: increase in horizontal stress in kN/m^2
+    txz: increase in shear stress in kN/m^2
+    '''
+    x_nodes = [x0, x0 + b, x0 + b + a, x0 + 2*b + a]
+    q_nodes = [0.0, q, q, 0.0]
+    return piecewise_load(x, z, x_nodes, q_nodes, cache)
+
+def principal_stresses(dsz, dsx, txz):
+    '''
+    Compute the principal stresses from the
+    vertical, horizontal and shear stresses
+
+    Input:
+    dsz: vertical stress in kN/m^2
+    dsx: horizontal stress in kN/m^2
+    txz: shear stress in kN/m^2
+
+    Output:
+    s1: major principal stress in kN/m^2
+    s3: minor principal stress in kN/m^2
+    angle: angle of s1 from the vertical in radians
+    '''
+    center = (dsz + dsx) / 2.0
+    radius = np.sqrt(((dsz - dsx) / 2.0)**2 + txz**2)
+    s1 = center + radius
+    s3 = center - radius
+    angle = 0.5 * np.arctan2(2.0 * txz, dsz - dsx)
+    return s1, s3, angle